@@ -0,0 +1,81 @@
+"""
+Compares the legacy ``get_only_changed_values`` with ``AuditDiff`` on form-like documents.
+
+    python benchmarks/audit_diff_benchmark.py [--questions 500] [--repeat 20]
+"""
+import argparse
+import copy
+import datetime
+import random
+import timeit
+
+from esg_lib.audit_logger.diff import diff_values
+from esg_lib.audit_logger.utils import get_only_changed_values
+from esg_lib.utils import generate_id
+
+
+def build_form(questions: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    return {
+        "_id": generate_id(),
+        "name": "Carbon footprint campaign",
+        "status": "DRAFT",
+        "entities": [generate_id() for _ in range(50)],
+        "tags": [f"tag-{i}" for i in range(30)],
+        "created_on": datetime.datetime(2024, 1, 1),
+        "settings": {
+            "notifications": {"enabled": True, "channels": ["email", "teams"]},
+            "deadline": datetime.datetime(2024, 6, 30),
+        },
+        "questions": [
+            {
+                "_id": generate_id(),
+                "label": f"Question {i}",
+                "type": rng.choice(["number", "text", "choice"]),
+                "required": rng.random() > 0.5,
+                "choices": [f"choice-{j}" for j in range(rng.randint(0, 6))],
+                "answer": {"value": rng.randint(0, 1000), "unit": "tCO2e", "comments": []},
+            }
+            for i in range(questions)
+        ],
+    }
+
+
+def scenarios(questions: int) -> dict:
+    old = build_form(questions)
+
+    identical = copy.deepcopy(old)
+
+    small_change = copy.deepcopy(old)
+    small_change["status"] = "PUBLISHED"
+    small_change["questions"][len(small_change["questions"]) // 2]["answer"]["value"] += 1
+
+    many_changes = copy.deepcopy(old)
+    for question in many_changes["questions"][::3]:
+        question["answer"]["value"] += 1
+        question["choices"] = list(reversed(question["choices"]))
+    many_changes["entities"] = list(reversed(many_changes["entities"]))
+    many_changes["tags"].append("new-tag")
+
+    return {
+        "identical": (old, identical),
+        "small change": (old, small_change),
+        "many changes": (old, many_changes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<15}{'legacy (ms)':>14}{'AuditDiff (ms)':>17}{'speedup':>10}")
+    for name, (old, new) in scenarios(args.questions).items():
+        legacy = min(timeit.repeat(lambda: get_only_changed_values(old, new), number=1, repeat=args.repeat))
+        current = min(timeit.repeat(lambda: diff_values(old, new), number=1, repeat=args.repeat))
+        print(f"{name:<15}{legacy * 1000:>14.3f}{current * 1000:>17.3f}{legacy / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
 from .audit_logger_module import AuditBlueprint
+from .writer import AuditLogWriter
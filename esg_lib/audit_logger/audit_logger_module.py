@@ -1,9 +1,18 @@
+import functools
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from flask import Blueprint, request, g
 
-from esg_lib.audit_logger.models.AuditLog import AuditLog
+from esg_lib.document import Document
 from esg_lib.audit_logger.utils import get_json_body, get_only_changed_values_and_id, get_action, get_primary_key_value
+from esg_lib.audit_logger.writer import AuditLogWriter
+from esg_lib.audit_logger.indexes import ensure_audit_indexes, missing_audit_indexes
+from esg_lib.audit_logger.partitions import get_audit_partitioner
+from esg_lib.audit_logger.rollups import ensure_rollup_indexes, record_rollups
 from esg_lib.constants import IGNORE_PATHS
+from esg_lib.utils import generate_id
 
 
 SUCCESS_STATUS_CODES = [200, 201, 204]
@@ -27,13 +36,87 @@ IGNORED_TERMS =["swagger","search"]
 class AuditBlueprint(Blueprint):
     """
         AuditBlueprint is a blueprint that logs changes to a collection in a MongoDB database.
+
+        Pass ``async_writer=True`` (or an ``AuditLogWriter`` instance) to persist logs
+        in batches from a background thread instead of saving them inside the request.
+
+        Pass ``ensure_indexes=True`` to create the audit search indexes (plus a retention
+        TTL index when ``audit_ttl`` is given in seconds) when the blueprint is registered,
+        or ``check_indexes=True`` to only log the missing ones.
+
+        ``diff_max_depth`` and ``diff_max_size`` bound the old/new value diff (see ``AuditDiff``).
+
+        Pass ``diff_executor="thread"`` or ``"process"`` (``diff_workers`` workers), or any
+        ``concurrent.futures.Executor``, to only capture the request data in ``after_request``
+        and compute the diff and primary key values in that executor before persisting.
+
+        Logs go to the period collection of their ``created_on`` when ``AUDIT_PARTITION_PERIOD``
+        is configured (see ``AuditPartitioner``).
+
+        Pass ``rollups=True`` to keep the daily activity counters of ``audit_rollups``
+        (see ``get_audit_rollups``) up to date as logs are written.
     """
     def __init__(self, *args, **kwargs):
         self.log_methods = kwargs.pop("log_methods", DEFAULT_LOG_METHODS)
         self.audit_collection = None
 
+        async_writer = kwargs.pop("async_writer", None)
+        if async_writer is True:
+            async_writer = AuditLogWriter(AUDIT_COLLECTION_NAME)
+        self.writer = async_writer or None
+
+        self.rollups = kwargs.pop("rollups", False)
+        if self.rollups and self.writer:
+            self.writer.on_write = self._record_rollups
+
+        self.ensure_indexes = kwargs.pop("ensure_indexes", False)
+        self.check_indexes = kwargs.pop("check_indexes", False)
+        self.audit_ttl = kwargs.pop("audit_ttl", None)
+        self.diff_max_depth = kwargs.pop("diff_max_depth", None)
+        self.diff_max_size = kwargs.pop("diff_max_size", None)
+
+        diff_executor = kwargs.pop("diff_executor", None)
+        diff_workers = kwargs.pop("diff_workers", 2)
+        if diff_executor == "thread":
+            diff_executor = ThreadPoolExecutor(max_workers=diff_workers, thread_name_prefix="audit-diff")
+        elif diff_executor == "process":
+            diff_executor = ProcessPoolExecutor(max_workers=diff_workers)
+        self.diff_executor = diff_executor
+
         super(AuditBlueprint, self).__init__(*args, **kwargs)
         self.after_request(self.after_data_request)
+        if self.ensure_indexes or self.check_indexes:
+            self.record_once(self._bootstrap_indexes)
+        if self.rollups:
+            self.record_once(self._bootstrap_rollups)
+
+    def _bootstrap_indexes(self, state):
+        logger = state.app.logger
+        try:
+            if self.ensure_indexes:
+                config = state.app.config
+                collation = config.get("AUDIT_FILTER_COLLATION") if config.get("AUDIT_STRICT_FILTERS") else None
+                created = ensure_audit_indexes(ttl_seconds=self.audit_ttl, collation=collation)
+                if created:
+                    logger.info("Audit indexes created or updated: %s", ", ".join(created))
+            else:
+                missing = missing_audit_indexes()
+                if missing:
+                    logger.warning("Audit collection is missing indexes: %s", ", ".join(missing))
+        except Exception:
+            logger.exception("Unable to check audit indexes")
+
+    def _bootstrap_rollups(self, state):
+        try:
+            ensure_rollup_indexes()
+        except Exception:
+            state.app.logger.exception("Unable to create audit rollup indexes")
+
+    def _record_rollups(self, collection_name, records):
+        try:
+            record_rollups(records)
+        except Exception:
+            traceback.print_exc()
 
     def _is_loggable(self, response) -> bool:
         return request.method in self.log_methods and response.status_code in SUCCESS_STATUS_CODES
@@ -45,10 +128,11 @@ class AuditBlueprint(Blueprint):
         if not table_name or table_name == AUDIT_COLLECTION_NAME or endpoint in IGNORE_PATHS or any(term in endpoint for term in IGNORED_TERMS):
             return response
 
-        primary_key = PRIMARY_KEY_MAPPING.get(table_name, "name")
-        primary_key_splits = primary_key.split(".")
-
         if self._is_loggable(response):
+            if self.diff_executor:
+                self._submit_log(response)
+                return response
+
             old_data = g.get("old_data", None)
 
             if g.get("new_data"):
@@ -56,59 +140,161 @@ class AuditBlueprint(Blueprint):
             else:
                 new_data = get_json_body(request)
 
-            if request.method == 'DELETE':
-                new_data = new_data or None
-                if old_data:
-                    if isinstance(old_data, list):
-                        old_data = [
-                            {
-                                "_id": d.get("_id"),
-                                "name": get_primary_key_value(primary_key_splits, d)
-                            } for d in old_data
-                        ]
-                    else:
-                        _id = old_data.get("_id")
-                        primary_value = get_primary_key_value(primary_key_splits, old_data)
-                        old_data = {
-                            "_id": _id,
-                            "name": primary_value
-                        }
-
-            elif request.method == 'GET':
-                new_data = old_data = None
-            else:
-                if g.get("new_data") is None:
-                    new_data, old_data = get_only_changed_values_and_id(old_data or {}, new_data) if old_data else (new_data, old_data)
-
-                if response.status_code == 201:
-                    if isinstance(new_data, list):
-                        final_value = [get_primary_key_value(primary_key_splits, d) for d in new_data]
-                        new_data = {
-                            "name": ",".join(str(v) for v in final_value if v is not None) if final_value else ""
-                        }
-                    else:
-                        primary_value = get_primary_key_value(primary_key_splits, new_data)
-                        new_data = {
-                            "name": primary_value
-                        }
-
+            new_data, old_data = get_log_values(
+                table_name,
+                request.method,
+                response.status_code,
+                old_data,
+                new_data,
+                diff=g.get("new_data") is None,
+                max_depth=self.diff_max_depth,
+                max_size=self.diff_max_size,
+            )
 
             action = get_action(request.method, response.status_code)
             self.create_log(action, endpoint, new_value=new_data, old_value=old_data)
 
         return response
 
-    def create_log(self, action: str, endpoint: str, new_value=None, old_value=None):
-        user_info = g.auth_user if g.get("auth_user") else {"email": "dummy@email.com", "fullname": "Dummy Name"}
+    def _get_user_info(self):
+        return g.auth_user if g.get("auth_user") else {"email": "dummy@email.com", "fullname": "Dummy Name"}
+
+    def _submit_log(self, response):
+        # Only capture references here, the diff runs in the executor
+        new_data = g.new_data if g.get("new_data") else None
+        snapshot = {
+            "table_name": g.get("table_name"),
+            "method": request.method,
+            "status_code": response.status_code,
+            "endpoint": request.path,
+            "user": self._get_user_info(),
+            "old_data": g.get("old_data", None),
+            "new_data": new_data,
+            "body": request.get_data() if new_data is None and request.is_json else None,
+            "diff": g.get("new_data") is None,
+            "max_depth": self.diff_max_depth,
+            "max_size": self.diff_max_size,
+            "created_on": datetime.utcnow(),
+        }
+        collection_name = self._get_collection_name(snapshot["created_on"])
+        future = self.diff_executor.submit(build_audit_log, snapshot)
+        future.add_done_callback(functools.partial(self._persist_future, collection_name))
 
+    def _persist_future(self, collection_name, future):
+        try:
+            self._persist(future.result(), collection_name)
+        except Exception:
+            traceback.print_exc()
+
+    def _get_collection_name(self, created_on: datetime) -> str:
+        # Resolved in the request, the partitioner relies on the app config
+        partitioner = get_audit_partitioner(AUDIT_COLLECTION_NAME)
+        if partitioner is None:
+            return AUDIT_COLLECTION_NAME
+        return partitioner.collection_for(created_on)
+
+    def _persist(self, audit_log: dict, collection_name: str = AUDIT_COLLECTION_NAME):
+        if self.writer:
+            self.writer.put(audit_log, collection_name)
+            return
+
+        if not audit_log.get("_id"):
+            audit_log["_id"] = generate_id()
+        Document.get_collection(collection_name).insert_one(audit_log)
+        if self.rollups:
+            self._record_rollups(collection_name, [audit_log])
+
+    def create_log(self, action: str, endpoint: str, new_value=None, old_value=None):
         audit_log = {
             "collection": g.get("table_name"),
             "action": action,
             "endpoint": endpoint,
-            "user": user_info,
+            "user": self._get_user_info(),
             "old_value": old_value,
             "new_value": new_value,
             "created_on": datetime.utcnow()
         }
-        action = AuditLog(**audit_log)
-        action.save()
+        self._persist(audit_log, self._get_collection_name(audit_log["created_on"]))
+
+
+def get_log_values(table_name, method, status_code, old_data, new_data, diff=True, max_depth=None, max_size=None):
+    """
+    Reduces the request data to the ``(new_value, old_value)`` pair stored in the audit log.
+    """
+    primary_key = PRIMARY_KEY_MAPPING.get(table_name, "name")
+    primary_key_splits = primary_key.split(".")
+
+    if method == 'DELETE':
+        new_data = new_data or None
+        if old_data:
+            if isinstance(old_data, list):
+                old_data = [
+                    {
+                        "_id": d.get("_id"),
+                        "name": get_primary_key_value(primary_key_splits, d)
+                    } for d in old_data
+                ]
+            else:
+                _id = old_data.get("_id")
+                primary_value = get_primary_key_value(primary_key_splits, old_data)
+                old_data = {
+                    "_id": _id,
+                    "name": primary_value
+                }
+
+    elif method == 'GET':
+        new_data = old_data = None
+    else:
+        if diff:
+            new_data, old_data = get_only_changed_values_and_id(
+                old_data or {}, new_data, max_depth=max_depth, max_size=max_size
+            ) if old_data else (new_data, old_data)
+
+        if status_code == 201:
+            if isinstance(new_data, list):
+                final_value = [get_primary_key_value(primary_key_splits, d) for d in new_data]
+                new_data = {
+                    "name": ",".join(str(v) for v in final_value if v is not None) if final_value else ""
+                }
+            else:
+                primary_value = get_primary_key_value(primary_key_splits, new_data)
+                new_data = {
+                    "name": primary_value
+                }
+
+    return new_data, old_data
+
+
+def build_audit_log(snapshot: dict) -> dict:
+    """
+    Builds an audit log from the request snapshot taken by ``AuditBlueprint._submit_log``.
+    Runs in the diff executor, so it only relies on the snapshot (picklable for process pools).
+    """
+    new_data = snapshot["new_data"]
+    if new_data is None:
+        try:
+            new_data = json.loads(snapshot["body"]) if snapshot["body"] else {}
+        except ValueError:
+            new_data = {}
+        new_data = new_data or {}
+
+    new_data, old_data = get_log_values(
+        snapshot["table_name"],
+        snapshot["method"],
+        snapshot["status_code"],
+        snapshot["old_data"],
+        new_data,
+        diff=snapshot["diff"],
+        max_depth=snapshot["max_depth"],
+        max_size=snapshot["max_size"],
+    )
+
+    return {
+        "collection": snapshot["table_name"],
+        "action": get_action(snapshot["method"], snapshot["status_code"]),
+        "endpoint": snapshot["endpoint"],
+        "user": snapshot["user"],
+        "old_value": old_data,
+        "new_value": new_data,
+        "created_on": snapshot["created_on"],
+    }
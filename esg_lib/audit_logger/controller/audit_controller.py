@@ -1,22 +1,62 @@
-from flask_restx import Resource
-from flask import request
+from flask_restx import Resource, marshal
+from flask import current_app as app, g, request
 
 
-from esg_lib.audit_logger.service.audit_service import get_audit_logs_paginated
+from esg_lib.audit_logger.audit_logger_module import AUDIT_COLLECTION_NAME
+from esg_lib.audit_logger.serializers import audit_export_response, audit_page_response
+from esg_lib.audit_logger.service.audit_service import export_audit_logs, get_audit_activity, get_audit_logs_paginated
 from esg_lib.dto import AuditDto
-from esg_lib.reqparse import get_default_paginated_request_parse
+from esg_lib.reqparse import get_default_paginated_request_parse, get_export_request_parse, get_rollup_request_parse
 
 api = AuditDto.api
 audit_pagination = AuditDto.audit_pagination
+audit_rollup = AuditDto.audit_rollup
 
 
 @api.route("/search")
 class AuditSearch(Resource):
     @api.doc("Get Audit logs")
-    @api.marshal_list_with(audit_pagination, skip_none=True)
-    @api.response(200, "Audit log successfully retrieved paginated.")
+    @api.response(200, "Audit log successfully retrieved paginated.", audit_pagination)
     def post(self):
         parser = get_default_paginated_request_parse()
         parser.remove_argument("search_value")
         args = parser.parse_args()
-        return get_audit_logs_paginated(args, request.json)
+        result = get_audit_logs_paginated(args, request.json)
+
+        if isinstance(result, tuple):
+            return marshal(result[0], audit_pagination, skip_none=True), result[1]
+
+        # AUDIT_FAST_JSON encodes the page without marshalling, streamed above AUDIT_STREAM_THRESHOLD rows
+        if app.config.get("AUDIT_FAST_JSON", False):
+            threshold = app.config.get("AUDIT_STREAM_THRESHOLD")
+            stream = bool(threshold) and len(result.content) >= threshold
+            return audit_page_response(result, stream=stream)
+
+        return marshal(result, audit_pagination, skip_none=True)
+
+
+@api.route("/export")
+class AuditExport(Resource):
+    @api.doc("Export Audit logs")
+    @api.expect(get_export_request_parse())
+    @api.response(200, "Audit logs streamed as NDJSON or CSV, gzipped when requested.")
+    def post(self):
+        # Reading the audit collection, AuditBlueprint skips logging it
+        g.table_name = AUDIT_COLLECTION_NAME
+        args = get_export_request_parse().parse_args()
+        cursor = export_audit_logs(request.get_json(silent=True), args["sort_key"], args["sort_order"])
+        if isinstance(cursor, tuple):
+            return cursor
+
+        return audit_export_response(cursor, args["format"], args["gzip"])
+
+
+@api.route("/summary")
+class AuditSummary(Resource):
+    @api.doc("Get Audit activity counts")
+    @api.expect(get_rollup_request_parse())
+    @api.marshal_list_with(audit_rollup, skip_none=True)
+    @api.response(200, "Audit activity counts successfully retrieved.")
+    def get(self):
+        args = get_rollup_request_parse().parse_args()
+        return get_audit_activity(args)
@@ -0,0 +1,160 @@
+from collections import Counter
+
+
+def _freeze(value):
+    """
+    Returns a hashable stand-in for ``value`` that compares equal whenever the values do.
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ("__list__", tuple(_freeze(v) for v in value))
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def same_items(old_list: list, new_list: list) -> bool:
+    """
+    Order-insensitive list comparison (multiset equality) that works on mixed and unhashable items.
+    """
+    if len(old_list) != len(new_list):
+        return False
+    try:
+        return Counter(old_list) == Counter(new_list)
+    except TypeError:
+        return Counter(_freeze(v) for v in old_list) == Counter(_freeze(v) for v in new_list)
+
+
+class AuditDiff:
+    """
+    Computes the changed values between two documents for audit logs.
+
+    Same output shape as ``get_only_changed_values``: a ``(new_diff, old_diff)`` pair of
+    dicts holding only what changed. Compared to it:
+
+    - identical subtrees are skipped by identity or C-level equality before recursing;
+    - scalar lists are compared as multisets instead of copied and sorted, so lists
+      of mixed types work;
+    - lists of dicts are matched by ``_id`` when their items carry one (the ``_id`` is
+      kept in the diff entries), by index otherwise, and removed items are reported;
+    - past ``max_depth`` nested levels, or for lists/dicts with more than ``max_size``
+      items, values are compared as a whole and reported in full when they differ.
+    """
+
+    def __init__(self, max_depth: int = None, max_size: int = None):
+        self.max_depth = max_depth
+        self.max_size = max_size
+
+    def diff(self, old_data: dict, new_data: dict):
+        return self._diff_dicts(old_data, new_data, 0)
+
+    def _too_large(self, value) -> bool:
+        return self.max_size is not None and len(value) > self.max_size
+
+    def _diff_dicts(self, old_data: dict, new_data: dict, depth: int):
+        diff_dict = {}
+        old_dict = {}
+
+        for key, new_value in new_data.items():
+            if key not in old_data:
+                diff_dict[key] = new_value
+                continue
+
+            old_value = old_data[key]
+            if new_value is old_value:
+                continue
+
+            if isinstance(new_value, dict) and isinstance(old_value, dict):
+                if new_value == old_value:
+                    continue
+                if (self.max_depth is not None and depth + 1 >= self.max_depth) or self._too_large(new_value):
+                    diff_dict[key] = new_value
+                    old_dict[key] = old_value
+                    continue
+                new_diff, old_diff = self._diff_dicts(old_value, new_value, depth + 1)
+                if new_diff:
+                    diff_dict[key] = new_diff
+                if old_diff:
+                    old_dict[key] = old_diff
+
+            elif isinstance(new_value, list) and isinstance(old_value, list):
+                if new_value == old_value:
+                    continue
+                if new_value and isinstance(new_value[0], dict):
+                    if (
+                        (self.max_depth is not None and depth + 1 >= self.max_depth)
+                        or self._too_large(new_value)
+                        or self._too_large(old_value)
+                    ):
+                        diff_dict[key] = new_value
+                        old_dict[key] = old_value
+                        continue
+                    new_items, old_items = self._diff_lists(old_value, new_value, depth + 1)
+                    if new_items:
+                        diff_dict[key] = new_items
+                    if old_items:
+                        old_dict[key] = old_items
+                elif not same_items(old_value, new_value):
+                    diff_dict[key] = new_value
+                    old_dict[key] = old_value
+
+            elif new_value != old_value:
+                diff_dict[key] = new_value
+                old_dict[key] = old_value
+
+        return diff_dict, old_dict
+
+    def _diff_items(self, old_item, new_item, depth: int):
+        if isinstance(old_item, dict) and isinstance(new_item, dict):
+            return self._diff_dicts(old_item, new_item, depth)
+        if old_item != new_item:
+            return new_item, old_item
+        return None, None
+
+    def _diff_lists(self, old_list: list, new_list: list, depth: int):
+        new_items = []
+        old_items = []
+
+        keyed = any(isinstance(item, dict) and "_id" in item for item in new_list)
+        if not keyed:
+            for index, new_item in enumerate(new_list):
+                if index >= len(old_list):
+                    new_items.append(new_item)
+                    continue
+                new_diff, old_diff = self._diff_items(old_list[index], new_item, depth)
+                if new_diff:
+                    new_items.append(new_diff)
+                if old_diff:
+                    old_items.append(old_diff)
+            old_items.extend(old_list[len(new_list):])
+            return new_items, old_items
+
+        old_by_id = {
+            item["_id"]: item for item in old_list if isinstance(item, dict) and "_id" in item
+        }
+        seen_ids = set()
+        for index, new_item in enumerate(new_list):
+            item_id = new_item.get("_id") if isinstance(new_item, dict) else None
+            if item_id is None or item_id not in old_by_id:
+                if item_id is None and index < len(old_list) and old_list[index] == new_item:
+                    continue
+                new_items.append(new_item)
+                continue
+
+            seen_ids.add(item_id)
+            old_item = old_by_id[item_id]
+            if old_item is new_item or old_item == new_item:
+                continue
+            new_diff, old_diff = self._diff_dicts(old_item, new_item, depth)
+            if new_diff:
+                new_items.append({"_id": item_id, **new_diff})
+            if old_diff:
+                old_items.append({"_id": item_id, **old_diff})
+
+        old_items.extend(item for item_id, item in old_by_id.items() if item_id not in seen_ids)
+        return new_items, old_items
+
+
+def diff_values(old_data: dict, new_data: dict, max_depth: int = None, max_size: int = None):
+    return AuditDiff(max_depth=max_depth, max_size=max_size).diff(old_data, new_data)
@@ -0,0 +1,74 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from esg_lib.audit_logger.models.AuditLog import AuditLog
+
+AUDIT_TTL_INDEX_NAME = "audit_retention_ttl"
+
+# Indexes backing get_audit_logs_paginated: default sort plus the usual filters
+AUDIT_INDEXES = [
+    {"name": "audit_created_on", "keys": [("created_on", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "audit_action_created_on", "keys": [("action", ASCENDING), ("created_on", DESCENDING)]},
+    {"name": "audit_collection_created_on", "keys": [("collection", ASCENDING), ("created_on", DESCENDING)]},
+    {"name": "audit_user_email_created_on", "keys": [("user.email", ASCENDING), ("created_on", DESCENDING)]},
+]
+
+
+def _get_audit_collection(collection=None):
+    if collection is not None:
+        return collection
+    return AuditLog.get_collection(AuditLog.__TABLE__)
+
+
+def _key_pattern(keys) -> tuple:
+    return tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in keys)
+
+
+def missing_audit_indexes(collection=None) -> list:
+    """
+    Returns the names of the declared audit indexes whose key pattern is not present.
+    """
+    collection = _get_audit_collection(collection)
+    existing = {_key_pattern(info["key"]) for info in collection.index_information().values()}
+    return [index["name"] for index in AUDIT_INDEXES if _key_pattern(index["keys"]) not in existing]
+
+
+def ensure_audit_indexes(collection=None, ttl_seconds: int = None, collation: dict = None) -> list:
+    """
+    Creates the missing audit indexes. Safe to call on every startup.
+
+    :param collection: Audit collection, defaults to ``AuditLog.__TABLE__``.
+    :param ttl_seconds: When set, keeps a TTL index on ``created_on`` so logs older than
+        this are removed by MongoDB. An existing TTL index is updated in place.
+    :param collation: Collation for the new indexes, e.g. ``CASE_INSENSITIVE_COLLATION``
+        when audit search runs strict filters with that collation.
+    :return: Names of the indexes that were created or modified.
+    """
+    collection = _get_audit_collection(collection)
+    missing = set(missing_audit_indexes(collection))
+    options = {"collation": collation} if collation else {}
+
+    models = [
+        IndexModel(index["keys"], name=index["name"], **options)
+        for index in AUDIT_INDEXES
+        if index["name"] in missing
+    ]
+    changed = [model.document["name"] for model in models]
+
+    if ttl_seconds:
+        ttl_index = collection.index_information().get(AUDIT_TTL_INDEX_NAME)
+        if ttl_index is None:
+            models.append(
+                IndexModel([("created_on", ASCENDING)], name=AUDIT_TTL_INDEX_NAME, expireAfterSeconds=ttl_seconds)
+            )
+            changed.append(AUDIT_TTL_INDEX_NAME)
+        elif ttl_index.get("expireAfterSeconds") != ttl_seconds:
+            collection.database.command(
+                "collMod",
+                collection.name,
+                index={"name": AUDIT_TTL_INDEX_NAME, "expireAfterSeconds": ttl_seconds},
+            )
+            changed.append(AUDIT_TTL_INDEX_NAME)
+
+    if models:
+        collection.create_indexes(models)
+    return changed
@@ -1,7 +1,7 @@
-from esg_lib.document import Document
+from esg_lib.document import SchemaDocument
 
 
-class AuditLog(Document):
+class AuditLog(SchemaDocument):
     __TABLE__ = "audit"
 
     _id = None
@@ -0,0 +1,230 @@
+import re
+import threading
+import time
+import traceback
+from datetime import date, datetime, timezone
+
+from flask import current_app as app, has_app_context
+
+from esg_lib.audit_logger.indexes import ensure_audit_indexes
+from esg_lib.document import Document
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+PERIOD_YEAR = "year"
+PERIODS = {
+    PERIOD_DAY: ("%Y_%m_%d", r"\d{4}_\d{2}_\d{2}"),
+    PERIOD_MONTH: ("%Y_%m", r"\d{4}_\d{2}"),
+    PERIOD_YEAR: ("%Y", r"\d{4}"),
+}
+DEFAULT_LIST_TTL = 60
+DEFAULT_ARCHIVE_PREFIX = "archive_"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Logs are stored as naive UTC datetimes
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return _naive_utc(value)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return _naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        except ValueError:
+            return None
+    return None
+
+
+def created_on_bounds(query: dict):
+    """
+    Returns the ``(start, end)`` datetimes bounding the ``created_on`` condition of
+    ``query``, either being None when the query does not bound that side.
+    """
+    condition = query.get("created_on")
+    if condition is None:
+        return None, None
+    if not isinstance(condition, dict):
+        value = _to_datetime(condition)
+        return value, value
+
+    start = _to_datetime(condition.get("$gte", condition.get("$gt")))
+    end = _to_datetime(condition.get("$lte", condition.get("$lt")))
+    return start, end
+
+
+class AuditPartitioner:
+    """
+    Spreads audit logs over one collection per period, named after the base collection
+    and the period start: ``audit_2026_10`` (month), ``audit_2026_10_16`` (day) or
+    ``audit_2026`` (year).
+
+    Searches only read the partitions overlapping their ``created_on`` bounds, plus the
+    unpartitioned base collection while ``include_base`` is set. Old partitions are
+    removed with ``archive`` (a rename) or ``drop``, which cost the same whatever their size.
+    """
+
+    def __init__(self, base_name: str, period: str = PERIOD_MONTH, include_base: bool = True, index_options=None):
+        if period not in PERIODS:
+            raise ValueError(f"Unsupported partition period: {period}")
+
+        self.base_name = base_name
+        self.period = period
+        self.include_base = include_base
+        self.index_options = index_options or {}
+
+        self._format, pattern = PERIODS[period]
+        self._name_pattern = re.compile(rf"^{re.escape(base_name)}_({pattern})$")
+        self._lock = threading.Lock()
+        self._ensured = set()
+        self._names = None
+        self._names_loaded_at = 0
+
+    def period_start(self, value: datetime) -> datetime:
+        if self.period == PERIOD_DAY:
+            return datetime(value.year, value.month, value.day)
+        if self.period == PERIOD_MONTH:
+            return datetime(value.year, value.month, 1)
+        return datetime(value.year, 1, 1)
+
+    def name_for(self, created_on: datetime) -> str:
+        return f"{self.base_name}_{self.period_start(created_on).strftime(self._format)}"
+
+    def start_of(self, name: str):
+        """
+        Returns the period start of a partition name, None for other collections.
+        """
+        match = self._name_pattern.match(name)
+        if not match:
+            return None
+        return datetime.strptime(match.group(1), self._format)
+
+    def ensure_partition(self, name: str):
+        """
+        Creates the audit indexes of a partition the first time this process writes to it.
+        """
+        if name in self._ensured:
+            return
+        try:
+            ensure_audit_indexes(Document.get_collection(name), **self.index_options)
+        except Exception:
+            traceback.print_exc()
+            return
+        with self._lock:
+            self._ensured.add(name)
+            if self._names is not None and name not in self._names:
+                self._names = sorted(self._names + [name])
+
+    def collection_for(self, created_on: datetime) -> str:
+        name = self.name_for(created_on)
+        self.ensure_partition(name)
+        return name
+
+    def list_partitions(self, refresh: bool = False) -> list:
+        """
+        Returns the existing partition names, oldest first. Listed at most every
+        ``DEFAULT_LIST_TTL`` seconds.
+        """
+        with self._lock:
+            names = self._names
+            fresh = time.monotonic() - self._names_loaded_at < DEFAULT_LIST_TTL
+
+        if names is None or refresh or not fresh:
+            database = Document.get_collection(self.base_name).database
+            names = sorted(
+                name
+                for name in database.list_collection_names(filter={"name": {"$regex": f"^{re.escape(self.base_name)}_"}})
+                if self.start_of(name) is not None
+            )
+            with self._lock:
+                self._names = names
+                self._names_loaded_at = time.monotonic()
+        return list(names)
+
+    def partitions_between(self, start: datetime = None, end: datetime = None) -> list:
+        """
+        Returns the collections to read for logs created between ``start`` and ``end``
+        (both optional), newest partition first, the base collection last.
+        """
+        lower = self.period_start(start) if start else None
+        names = [
+            name
+            for name in self.list_partitions()
+            if (lower is None or self.start_of(name) >= lower) and (end is None or self.start_of(name) <= end)
+        ]
+        names.reverse()
+        if self.include_base:
+            names.append(self.base_name)
+        return names
+
+    def partitions_for_query(self, query: dict) -> list:
+        return self.partitions_between(*created_on_bounds(query))
+
+    def _expired(self, before: datetime) -> list:
+        lower = self.period_start(before)
+        return [name for name in self.list_partitions(refresh=True) if self.start_of(name) < lower]
+
+    def archive(self, before: datetime, prefix: str = DEFAULT_ARCHIVE_PREFIX) -> list:
+        """
+        Renames the partitions of the periods ended before ``before`` to ``<prefix><name>``,
+        taking them out of searches. Returns the archived partition names.
+        """
+        archived = []
+        for name in self._expired(before):
+            Document.get_collection(name).rename(f"{prefix}{name}")
+            archived.append(name)
+        self._forget(archived)
+        return archived
+
+    def drop(self, before: datetime) -> list:
+        """
+        Drops the partitions of the periods ended before ``before``. Returns their names.
+        """
+        dropped = []
+        for name in self._expired(before):
+            Document.get_collection(name).drop()
+            dropped.append(name)
+        self._forget(dropped)
+        return dropped
+
+    def _forget(self, names: list):
+        with self._lock:
+            self._ensured.difference_update(names)
+            if self._names is not None:
+                self._names = [name for name in self._names if name not in names]
+
+
+_partitioners = {}
+_partitioners_lock = threading.Lock()
+
+
+def get_audit_partitioner(base_name: str = "audit"):
+    """
+    Returns the partitioner configured by ``AUDIT_PARTITION_PERIOD`` (``day``, ``month`` or
+    ``year``), or None when audit logs are not partitioned.
+    ``AUDIT_PARTITION_INCLUDE_BASE`` (default True) keeps searching the base collection.
+    """
+    if not has_app_context():
+        return None
+    period = app.config.get("AUDIT_PARTITION_PERIOD")
+    if not period:
+        return None
+
+    include_base = app.config.get("AUDIT_PARTITION_INCLUDE_BASE", True)
+    collation = app.config.get("AUDIT_FILTER_COLLATION") if app.config.get("AUDIT_STRICT_FILTERS") else None
+    key = (base_name, period, include_base, repr(collation))
+    with _partitioners_lock:
+        partitioner = _partitioners.get(key)
+        if partitioner is None:
+            partitioner = _partitioners[key] = AuditPartitioner(
+                base_name,
+                period,
+                include_base=include_base,
+                index_options={"collation": collation} if collation else None,
+            )
+        return partitioner
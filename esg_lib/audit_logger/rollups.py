@@ -0,0 +1,149 @@
+from collections import Counter
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+from esg_lib.document import Document
+from esg_lib.mongo import get_secondary_read_preference
+
+ROLLUP_COLLECTION_NAME = "audit_rollups"
+ROLLUP_INDEX_NAME = "audit_rollups_bucket"
+ROLLUP_FIELDS = ["collection", "action", "user_email"]
+GRANULARITIES = ["day", "week", "month", "year"]
+
+
+def _bucket(created_on: datetime) -> datetime:
+    return datetime(created_on.year, created_on.month, created_on.day)
+
+
+def _rollup_key(record: dict) -> tuple:
+    user = record.get("user") or {}
+    return (
+        _bucket(record.get("created_on") or datetime.utcnow()),
+        record.get("collection"),
+        record.get("action"),
+        user.get("email") if isinstance(user, dict) else None,
+    )
+
+
+def _rollup_id(bucket: datetime, collection, action, user_email) -> str:
+    return "|".join([bucket.strftime("%Y-%m-%d"), collection or "", action or "", user_email or ""])
+
+
+def _rollup_update(key: tuple, count: int) -> UpdateOne:
+    bucket, collection, action, user_email = key
+    return UpdateOne(
+        {"_id": _rollup_id(bucket, collection, action, user_email)},
+        {
+            "$inc": {"count": count},
+            "$setOnInsert": {"bucket": bucket, "collection": collection, "action": action, "user_email": user_email},
+        },
+        upsert=True,
+    )
+
+
+def ensure_rollup_indexes(collection=None):
+    collection = collection if collection is not None else Document.get_collection(ROLLUP_COLLECTION_NAME)
+    collection.create_indexes([IndexModel([("bucket", ASCENDING)], name=ROLLUP_INDEX_NAME)])
+
+
+def record_rollups(records: list, collection=None) -> int:
+    """
+    Adds written audit records to the daily counters of ``audit_rollups``, keyed by day,
+    collection, action and user email. Records sharing a key are counted together and
+    every key is sent as one ``$inc`` upsert in a single unordered ``bulk_write``.
+
+    Returns the number of counters updated.
+    """
+    counts = Counter(_rollup_key(record) for record in records)
+    if not counts:
+        return 0
+
+    operations = [_rollup_update(key, count) for key, count in counts.items()]
+    collection = collection if collection is not None else Document.get_collection(ROLLUP_COLLECTION_NAME)
+    collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+def get_audit_rollups(start: datetime = None, end: datetime = None, group_by=None, granularity: str = "day", filters=None) -> list:
+    """
+    Returns audit activity counts from ``audit_rollups``, costing O(buckets) whatever the
+    number of logs.
+
+    :param start: First day included, ``end`` being excluded. Both are truncated to the day.
+    :param group_by: Fields among ``ROLLUP_FIELDS`` to split the counts by, none by default.
+    :param granularity: ``day``, ``week``, ``month`` or ``year`` bucket of the returned rows
+        (anything above a day relies on ``$dateTrunc``, MongoDB 5.0+).
+    :param filters: Equality conditions on ``ROLLUP_FIELDS``, e.g. ``{"action": "DELETE"}``.
+    :return: ``[{"bucket": datetime, <group_by fields>, "count": int}]`` sorted by bucket.
+    """
+    group_by = list(group_by or [])
+    unknown = [field for field in group_by + list(filters or {}) if field not in ROLLUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unsupported rollup fields: {', '.join(unknown)}")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+    match = dict(filters or {})
+    if start or end:
+        match["bucket"] = {}
+        if start:
+            match["bucket"]["$gte"] = _bucket(start)
+        if end:
+            match["bucket"]["$lt"] = _bucket(end)
+
+    bucket = "$bucket" if granularity == "day" else {"$dateTrunc": {"date": "$bucket", "unit": granularity}}
+    group_id = {"bucket": bucket, **{field: f"${field}" for field in group_by}}
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": group_id, "count": {"$sum": "$count"}}},
+        {"$sort": {"_id.bucket": ASCENDING}},
+    ]
+
+    collection = Document.get_collection(ROLLUP_COLLECTION_NAME, get_secondary_read_preference())
+    return [{**row["_id"], "count": row["count"]} for row in collection.aggregate(pipeline)]
+
+
+def rebuild_audit_rollups(collection_names: list, start: datetime = None, end: datetime = None):
+    """
+    Recomputes the daily counters of ``[start, end)`` from the raw logs of ``collection_names``
+    (e.g. to backfill logs written before rollups were enabled). Existing counters of that
+    range are replaced, so run it over periods that no longer receive logs.
+
+    Both bounds are truncated to the day, since counters cover whole days: a mid-day
+    ``end`` leaves that day's counters untouched.
+    """
+    match = {}
+    if start or end:
+        match["created_on"] = {}
+        if start:
+            match["created_on"]["$gte"] = _bucket(start)
+        if end:
+            match["created_on"]["$lt"] = _bucket(end)
+
+    rollups = Document.get_collection(ROLLUP_COLLECTION_NAME)
+    rollups.delete_many({"bucket": match["created_on"]} if match else {})
+
+    for name in collection_names:
+        rows = Document.get_collection(name).aggregate(
+            [
+                {"$match": match},
+                {
+                    "$group": {
+                        "_id": {
+                            "bucket": {"$dateTrunc": {"date": "$created_on", "unit": "day"}},
+                            "collection": "$collection",
+                            "action": "$action",
+                            "user_email": "$user.email",
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ]
+        )
+        operations = [
+            _rollup_update(tuple(row["_id"].get(field) for field in ["bucket"] + ROLLUP_FIELDS), row["count"])
+            for row in rows
+        ]
+        if operations:
+            rollups.bulk_write(operations, ordered=False)
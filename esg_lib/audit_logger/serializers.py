@@ -0,0 +1,206 @@
+import csv
+import datetime
+import json
+import zlib
+
+from bson import ObjectId
+from flask import Response, stream_with_context
+
+# Page fields of AuditDto.audit_pagination with the type marshal casts them to
+PAGE_FIELDS = [("page", int), ("size", int), ("total", int), ("total_capped", bool), ("next_cursor", str)]
+DEFAULT_STREAM_CHUNK_SIZE = 100
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["id", "collection", "action", "user_fullname", "user_email", "old_value", "new_value", "created_on"]
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default)
+
+
+def _get(obj, field):
+    if isinstance(obj, dict):
+        return obj.get(field)
+    return getattr(obj, field, None)
+
+
+def _string(value):
+    return None if value is None else str(value)
+
+
+def _datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day).isoformat()
+    return value
+
+
+def serialize_audit_log(row) -> dict:
+    """
+    Returns the ``AuditDto.audit_info`` representation of an ``AuditLog`` or a raw audit
+    document. ``old_value``/``new_value`` are left as is, the encoder handles their
+    datetime, date and ObjectId values.
+    """
+    if isinstance(row, dict):
+        _id = row.get("id", row.get("_id"))
+    else:
+        _id = row.id
+    user = _get(row, "user") or {}
+
+    return {
+        "id": _string(_id),
+        "collection": _string(_get(row, "collection")),
+        "action": _string(_get(row, "action")),
+        "user": {"fullname": _string(_get(user, "fullname")), "email": _string(_get(user, "email"))},
+        "old_value": _get(row, "old_value"),
+        "new_value": _get(row, "new_value"),
+        "created_on": _datetime(_get(row, "created_on")),
+    }
+
+
+def _page_header(page) -> dict:
+    header = {}
+    for field, cast in PAGE_FIELDS:
+        value = _get(page, field)
+        if value is not None:
+            header[field] = cast(value)
+    return header
+
+
+def dumps_audit_page(page) -> str:
+    """
+    Encodes a ``Paginator`` of audit logs to the JSON ``marshal(page, audit_pagination,
+    skip_none=True)`` produces, without building the marshalled dict first.
+    """
+    return "".join(iter_audit_page(page, chunk_size=None))
+
+
+def iter_audit_page(page, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """
+    Yields the JSON of ``page`` in chunks of ``chunk_size`` audit logs (one chunk when None).
+    """
+    header = _encoder.encode(_page_header(page))
+    content = _get(page, "content")
+    if content is None:
+        yield header + "\n"
+        return
+
+    # Splice the content list into the header object
+    prefix = header[:-1] + (', "content": [' if len(header) > 2 else '"content": [')
+    parts = [prefix]
+    for index, row in enumerate(content):
+        if index:
+            parts.append(", ")
+        parts.append(_encoder.encode(serialize_audit_log(row)))
+        if chunk_size and (index + 1) % chunk_size == 0:
+            yield "".join(parts)
+            parts = []
+    parts.append("]}\n")
+    yield "".join(parts)
+
+
+def audit_page_response(page, status: int = 200, stream: bool = False, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """
+    Returns a JSON ``Response`` for an audit page, sent with chunked transfer encoding
+    when ``stream`` is set.
+    """
+    if stream:
+        return Response(stream_with_context(iter_audit_page(page, chunk_size)), status=status, mimetype="application/json")
+    return Response(dumps_audit_page(page), status=status, mimetype="application/json")
+
+
+class _Echo:
+    # csv.writer returns what the file's write returns, so each row comes back as a string
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield _encoder.encode(serialize_audit_log(row)) + "\n"
+
+
+def iter_csv(rows):
+    """
+    Yields a CSV line per audit log, ``old_value`` and ``new_value`` being JSON encoded.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        item = serialize_audit_log(row)
+        user = item["user"]
+        yield writer.writerow(
+            [
+                item["id"],
+                item["collection"],
+                item["action"],
+                user["fullname"],
+                user["email"],
+                "" if item["old_value"] is None else _encoder.encode(item["old_value"]),
+                "" if item["new_value"] is None else _encoder.encode(item["new_value"]),
+                item["created_on"],
+            ]
+        )
+
+
+def _chunked(lines, chunk_size=EXPORT_CHUNK_SIZE):
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(rows, export_format: str = "ndjson", compress: bool = False):
+    """
+    Encodes ``rows`` (any iterable, typically a cursor) incrementally as NDJSON or CSV,
+    yielding bytes chunks of about ``EXPORT_CHUNK_SIZE``, gzipped when ``compress`` is set.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    lines = iter_csv(rows) if export_format == "csv" else iter_ndjson(rows)
+    chunks = _chunked(lines)
+    return _gzipped(chunks) if compress else chunks
+
+
+def audit_export_response(rows, export_format: str = "ndjson", compress: bool = False, filename: str = "audit"):
+    """
+    Returns a streamed download ``Response`` of the audit logs in ``rows``.
+    """
+    chunks = iter_export(rows, export_format, compress)
+    filename = f"{filename}.{export_format}"
+    mimetype = EXPORT_FORMATS[export_format]
+    if compress:
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
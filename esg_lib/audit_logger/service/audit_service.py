@@ -1,33 +1,309 @@
+import heapq
+from datetime import datetime
+
+from bson import ObjectId
+
+from flask import current_app as app
+
 from esg_lib.audit_logger.models.AuditLog import AuditLog
+from esg_lib.audit_logger.partitions import get_audit_partitioner
+from esg_lib.audit_logger.rollups import get_audit_rollups
+from esg_lib.audit_logger.utils import get_primary_key_value
 from esg_lib.decorators import catch_exceptions
-from esg_lib.paginator import Paginator
+from esg_lib.document import Document
+from esg_lib.paginator import Paginator, encode_cursor, decode_cursor, keyset_condition
 from esg_lib.filters import build_filters
+from esg_lib.mongo import get_secondary_read_preference
 
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_CAPPED = "capped"
+COUNT_FACET = "facet"
+COUNT_STRATEGIES = [COUNT_EXACT, COUNT_ESTIMATED, COUNT_CAPPED, COUNT_FACET]
+DEFAULT_COUNT_CAP = 10000
+DEFAULT_EXPORT_BATCH_SIZE = 2000
+# Added to searches without an action filter, RETRIEVE logs are only written when GET is logged
+DEFAULT_ACTION_FILTER = {"$ne": "RETRIEVE"}
 
-@catch_exceptions
-def get_audit_logs_paginated(args, data):
-    query = build_filters(data.get("filters", []))
+# Fields rendered by AuditDto.audit_info, with _id renamed to id
+RAW_ROW_PROJECTION = {
+    "_id": 0,
+    "id": "$_id",
+    "collection": 1,
+    "action": 1,
+    "user.fullname": 1,
+    "user.email": 1,
+    "old_value": 1,
+    "new_value": 1,
+    "created_on": 1,
+}
+
+
+def count_audit_logs(collection, query, strategy=COUNT_EXACT, cap=DEFAULT_COUNT_CAP, collation=None):
+    """
+    Counts the audit logs matching ``query``.
+
+    - ``exact``: ``count_documents``.
+    - ``estimated``: collection metadata via ``estimated_document_count`` when the query
+      is empty or only holds the default RETRIEVE exclusion (so the estimate includes
+      RETRIEVE logs when GET requests are logged), an exact count otherwise.
+    - ``capped``: stops counting after ``cap`` documents.
+
+    Returns a ``(total, capped)`` tuple where ``capped`` tells if ``total`` is a lower bound.
+    """
+    options = {"collation": collation} if collation else {}
+
+    if strategy == COUNT_ESTIMATED and (not query or query == {"action": DEFAULT_ACTION_FILTER}):
+        return collection.estimated_document_count(), False
+
+    if strategy == COUNT_CAPPED:
+        total = collection.count_documents(query, limit=cap + 1, **options)
+        if total > cap:
+            return cap, True
+        return total, False
+
+    return collection.count_documents(query, **options), False
+
+
+def build_audit_query(data: dict):
+    """
+    Returns the ``(query, collation)`` pair matching the filters of a search or export body.
+    """
+    # AUDIT_STRICT_FILTERS compiles filters to index-friendly conditions (see build_filters)
+    strict = app.config.get("AUDIT_STRICT_FILTERS", False)
+    collation = app.config.get("AUDIT_FILTER_COLLATION") if strict else None
+    query = build_filters((data or {}).get("filters", []), strict=strict)
 
     if "action" not in query:
-        query["action"] = {"$ne": "RETRIEVE"}
+        query["action"] = dict(DEFAULT_ACTION_FILTER)
+
+    return query, collation
+
+
+def raw_row_projection(sort_key: str = None) -> dict:
+    """
+    Returns the ``$project`` stage of raw rows, keeping ``sort_key`` for the cursor.
+    """
+    projection = dict(RAW_ROW_PROJECTION)
+    if not sort_key or sort_key in ["id", "_id"]:
+        return projection
+    if any(sort_key == field or sort_key.startswith(field + ".") for field in projection):
+        return projection
+
+    # Replace the sub-fields of the sort key to avoid a path collision
+    for field in [field for field in projection if field.startswith(sort_key + ".")]:
+        del projection[field]
+    projection[sort_key] = 1
+    return projection
+
+
+def get_audit_collection_names(query: dict) -> list:
+    """
+    Returns the audit collections to search: the partitions overlapping the ``created_on``
+    bounds of ``query`` when audit logs are partitioned, the audit collection otherwise.
+    """
+    partitioner = get_audit_partitioner(AuditLog.__TABLE__)
+    if partitioner is None:
+        return [AuditLog.__TABLE__]
+    return partitioner.partitions_for_query(query) or [AuditLog.__TABLE__]
+
+
+def _sort_values(sort_by: str, row: dict):
+    # Raw rows carry the _id as id
+    _id = row["_id"] if "_id" in row else row.get("id")
+    return (_id if sort_by == "_id" else get_primary_key_value(sort_by.split("."), row)), _id
+
+
+# Sort keys holding one scalar type, the only ones partition pages can be merged on
+MERGE_SORT_KEYS = ["_id", "created_on", "action", "collection", "user.email"]
+STRING_SORT_KEYS = ["action", "collection", "user.email"]
+
+
+def _check_merge_sort_key(sort_by: str, collation=None):
+    """
+    Raises ``ValueError`` when results of several partitions cannot be merged on ``sort_by``.
+    """
+    if sort_by not in MERGE_SORT_KEYS:
+        raise ValueError(f"Partitioned audit logs can only be sorted by: {', '.join(MERGE_SORT_KEYS)}")
+    if collation and sort_by in STRING_SORT_KEYS:
+        # Partitions come back in collation order, which Python comparisons do not follow
+        raise ValueError(f"Partitioned audit logs cannot be sorted by {sort_by} with a filter collation")
+
+
+def _bson_order(value) -> tuple:
+    # MongoDB orders mixed types as null < numbers < strings < ObjectId < booleans < dates
+    if value is None:
+        return 0, 0
+    if isinstance(value, bool):
+        return 4, value
+    if isinstance(value, (int, float)):
+        return 1, value
+    if isinstance(value, str):
+        return 2, value
+    if isinstance(value, ObjectId):
+        return 3, value
+    if isinstance(value, datetime):
+        return 5, value
+    raise ValueError(f"Unsupported sort value type for partitioned audit logs: {type(value).__name__}")
+
+
+def _sort_key(sort_by: str):
+    def key(row):
+        value, _id = _sort_values(sort_by, row)
+        return _bson_order(value), _bson_order(_id)
+
+    return key
+
+
+def _fetch_page(collection, query, page_stages, count_strategy, count_cap, collation=None):
+    """
+    Returns the ``(rows, total, capped)`` of one audit collection.
+    """
+    aggregate_options = {"collation": collation} if collation else {}
+
+    if count_strategy == COUNT_FACET:
+        # $facet sub-pipelines cannot use indexes: $sort runs before it, only $skip/$limit/$project inside
+        split = 0
+        while split < len(page_stages) and ("$match" in page_stages[split] or "$sort" in page_stages[split]):
+            split += 1
+        head, tail = page_stages[:split], page_stages[split:]
+
+        if any("$match" in stage for stage in head):
+            # A keyset $match before $facet would restrict the count, count the query on its own
+            rows = list(collection.aggregate([{"$match": query}] + page_stages, **aggregate_options))
+            return rows, count_audit_logs(collection, query, COUNT_EXACT, count_cap, collation)[0], False
+
+        # Page and count in a single round trip
+        result = next(
+            collection.aggregate(
+                [{"$match": query}] + head + [{"$facet": {"content": tail, "total": [{"$count": "total"}]}}],
+                **aggregate_options
+            ),
+            {},
+        )
+        total = result["total"][0]["total"] if result.get("total") else 0
+        return result.get("content", []), total, False
+
+    rows = list(collection.aggregate([{"$match": query}] + page_stages, **aggregate_options))
+    total, capped = count_audit_logs(collection, query, count_strategy, count_cap, collation)
+    return rows, total, capped
+
+
+@catch_exceptions
+def get_audit_logs_paginated(args, data, count_strategy=None, raw=None):
+    """
+    Returns a ``Paginator`` of ``AuditLog`` matching the filters of ``data``.
+
+    With partitioned audit logs, every partition overlapping the ``created_on`` filter is
+    paged and counted, then the pages are merged in sort order. Only ``MERGE_SORT_KEYS``
+    can be sorted on then, without string keys when a filter collation is set.
+
+    With ``raw`` (``AUDIT_RAW_ROWS`` by default) the content is the projected documents,
+    as dicts with an ``id`` key, instead of ``AuditLog`` instances.
+    """
+    query, collation = build_audit_query(data)
+
+    if raw is None:
+        raw = app.config.get("AUDIT_RAW_ROWS", False)
+
+    count_strategy = count_strategy or app.config.get("AUDIT_COUNT_STRATEGY", COUNT_EXACT)
+    if count_strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"Unsupported count strategy: {count_strategy}")
 
     page = args.get("page")
     per_page = args.get("size")
     sort_by = args.get("sort_key", "id")
     sort_order = args.get("sort_order", -1)
+    cursor = args.get("cursor")
+
+    sort_by = "_id" if sort_by in ["id", "_id"] else sort_by
+    sort = {sort_by: sort_order} if sort_by == "_id" else {sort_by: sort_order, "_id": sort_order}
+    collection_names = get_audit_collection_names(query)
+    partitioned = len(collection_names) > 1
+    if partitioned:
+        _check_merge_sort_key(sort_by, collation)
 
-    collection = AuditLog().db()
-    skip = max((page - 1) * per_page, 0)
-    total_items = collection.aggregate(
-        [
-            {"$match": query},
+    if cursor is not None:
+        # Keyset pagination on (sort_key, _id): an empty cursor requests the first page
+        page_stages = [{"$sort": sort}, {"$limit": per_page + 1}]
+        if cursor:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_order)
+            page_stages.insert(0, {"$match": keyset_condition(sort_by, sort_order, last_value, last_id)})
+    elif partitioned:
+        # Every partition returns its first skip + size rows, the page is cut after the merge
+        skip = max((page - 1) * per_page, 0)
+        page_stages = [{"$sort": sort}, {"$limit": skip + per_page}]
+    else:
+        skip = max((page - 1) * per_page, 0)
+        page_stages = [
             {"$sort": {sort_by: sort_order}},
             {"$skip": skip},
             {"$limit": per_page},
         ]
-    )
 
-    data = [AuditLog(**entity) for entity in total_items]
-    total = collection.find(query, {"_id": 1}).count()
+    if raw:
+        page_stages.append({"$project": raw_row_projection(sort_by)})
+
+    read_preference = get_secondary_read_preference()
+    count_cap = app.config.get("AUDIT_COUNT_CAP", DEFAULT_COUNT_CAP)
+    pages = [
+        _fetch_page(Document.get_collection(name, read_preference), query, page_stages, count_strategy, count_cap, collation)
+        for name in collection_names
+    ]
+
+    total = sum(page_total for _, page_total, _ in pages)
+    total_capped = any(capped for _, _, capped in pages) or None
+    if partitioned:
+        rows = list(heapq.merge(*[page_rows for page_rows, _, _ in pages], key=_sort_key(sort_by), reverse=sort_order < 0))
+        if cursor is None:
+            rows = rows[skip:skip + per_page]
+    else:
+        rows = pages[0][0]
+
+    next_cursor = None
+    if cursor is not None and len(rows) > per_page:
+        rows = rows[:per_page]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, *_sort_values(sort_by, last_row))
+
+    data = rows if raw else [AuditLog.from_mongo(entity) for entity in rows]
+
+    return Paginator(data, page, per_page, total, next_cursor=next_cursor, total_capped=total_capped)
 
-    return Paginator(data, page, per_page, total)
+
+@catch_exceptions
+def export_audit_logs(data, sort_key="_id", sort_order=-1, batch_size=None):
+    """
+    Returns a cursor over every audit log matching the filters of ``data``, read from a
+    secondary when allowed, in batches of ``batch_size`` (``AUDIT_EXPORT_BATCH_SIZE``).
+    Rows are raw projected documents, as in ``get_audit_logs_paginated(raw=True)``.
+    Partition cursors are merged lazily in sort order.
+    """
+    query, collation = build_audit_query(data)
+    sort_key = "_id" if sort_key in ["id", "_id"] else sort_key
+    sort = [(sort_key, sort_order)] if sort_key == "_id" else [(sort_key, sort_order), ("_id", sort_order)]
+    options = {"collation": collation} if collation else {}
+
+    collection_names = get_audit_collection_names(query)
+    if len(collection_names) > 1:
+        _check_merge_sort_key(sort_key, collation)
+
+    read_preference = get_secondary_read_preference()
+    batch_size = batch_size or app.config.get("AUDIT_EXPORT_BATCH_SIZE", DEFAULT_EXPORT_BATCH_SIZE)
+    cursors = [
+        Document.get_collection(name, read_preference).find(
+            query, raw_row_projection(sort_key), sort=sort, batch_size=batch_size, **options
+        )
+        for name in collection_names
+    ]
+    if len(cursors) == 1:
+        return cursors[0]
+    return heapq.merge(*cursors, key=_sort_key(sort_key), reverse=sort_order < 0)
+
+
+@catch_exceptions
+def get_audit_activity(args):
+    """
+    Returns the audit activity counts of the ``audit_rollups`` counters (see ``get_audit_rollups``).
+    """
+    return get_audit_rollups(args.get("start"), args.get("end"), args.get("group_by"), args.get("granularity", "day"))
@@ -3,6 +3,8 @@ import copy
 from typing import Union
 from flask import Request
 
+from esg_lib.audit_logger.diff import diff_values
+
 
 def get_json_body(req: Request) -> Union[list, dict]:
     try:
@@ -62,8 +64,8 @@ def get_only_changed_values(old_data: dict, new_data: dict):
     return diff_dict, old_dict
 
 
-def get_only_changed_values_and_id(old_data: dict, new_data: dict):
-    diff_dict, old_dict = get_only_changed_values(old_data, new_data)
+def get_only_changed_values_and_id(old_data: dict, new_data: dict, max_depth: int = None, max_size: int = None):
+    diff_dict, old_dict = diff_values(old_data, new_data, max_depth=max_depth, max_size=max_size)
 
     if "_id" in old_data:
         diff_dict["_id"] = old_data.get("_id")
@@ -0,0 +1,246 @@
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+
+from bson import json_util
+
+from esg_lib.document import Document
+from esg_lib.utils import generate_id
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = [OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_SPILL]
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BLOCK_TIMEOUT = 5.0
+DEFAULT_SPILL_PATH = "audit_spill.jsonl"
+
+
+class AuditLogWriter:
+    """
+    Background writer that persists audit records in batches.
+
+    Records are put on a bounded in-process queue and a daemon thread flushes
+    them with ``insert_many`` once ``batch_size`` records are pending or
+    ``flush_interval`` seconds have passed. When the queue is full, the
+    ``overflow_policy`` decides what happens to new records:
+
+    - ``"block"``: wait for room (at most ``block_timeout`` seconds, then drop; None
+      waits forever).
+    - ``"drop"``: discard the record.
+    - ``"spill"``: append the record to ``spill_path`` as MongoDB Extended JSON,
+      one document per line, so it can be replayed later with ``mongoimport``.
+      Records of other collections than ``collection_name`` (audit partitions) are
+      spilled to ``<spill_path root>.<collection><ext>``.
+
+    ``on_write(collection_name, records)`` is called from the writer thread after each
+    successful ``insert_many``. Pending records are flushed when the process exits.
+
+    The writer thread starts with the first record, and again in forked children (e.g.
+    gunicorn ``--preload`` workers), so the writer can be created at import time.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        overflow_policy: str = OVERFLOW_BLOCK,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+        spill_path: str = DEFAULT_SPILL_PATH,
+        on_write=None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow_policy}")
+
+        self.collection_name = collection_name
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.spill_path = spill_path
+        self.on_write = on_write
+
+        self.max_queue_size = max_queue_size
+
+        self._start_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._pid = None
+        self._thread = None
+        self._reset()
+        atexit.register(self.close)
+
+    def _reset(self):
+        # Fresh queue and locks: the ones inherited through fork may be held by a thread that no longer exists
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "failed": 0,
+        }
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Forked child: the parent's thread and pending records stay in the parent
+                self._reset()
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+            self._pid = pid
+
+    def put(self, record: dict, collection_name: str = None) -> bool:
+        """
+        Queues a record for writing to ``collection_name`` (the writer's collection by
+        default). Returns False if the record was not queued.
+        """
+        if self._closed.is_set():
+            self._increment("dropped")
+            return False
+
+        self._ensure_started()
+        if "_id" not in record or not record["_id"]:
+            record["_id"] = generate_id()
+        item = (collection_name or self.collection_name, record)
+
+        try:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow_policy == OVERFLOW_SPILL:
+                self._spill(item[0], [record])
+            else:
+                self._increment("dropped")
+            return False
+
+        self._increment("enqueued")
+        return True
+
+    def flush(self, timeout: float = None):
+        """
+        Blocks until every record queued so far has been handled.
+        """
+        if timeout is None:
+            self._queue.join()
+            return
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout: float = 10.0):
+        """
+        Stops accepting records and flushes whatever is still queued.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["queue_depth"] = self.queue_depth
+        return counters
+
+    def _increment(self, counter: str, value: int = 1):
+        with self._lock:
+            self._counters[counter] += value
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+            except queue.Empty:
+                pass
+
+            closing = self._closed.is_set()
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or closing:
+                if closing:
+                    batch.extend(self._drain())
+                if batch:
+                    self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                if closing:
+                    return
+
+    def _drain(self) -> list:
+        records = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return records
+
+    def _write(self, batch: list):
+        records_by_collection = {}
+        for collection_name, record in batch:
+            records_by_collection.setdefault(collection_name, []).append(record)
+
+        for collection_name, records in records_by_collection.items():
+            for start in range(0, len(records), self.batch_size):
+                chunk = records[start:start + self.batch_size]
+                try:
+                    Document.get_collection(collection_name).insert_many(chunk, ordered=False)
+                    self._increment("written", len(chunk))
+                except Exception:
+                    traceback.print_exc()
+                    self._increment("failed", len(chunk))
+                    if self.overflow_policy == OVERFLOW_SPILL:
+                        self._spill(collection_name, chunk)
+                else:
+                    self._notify_write(collection_name, chunk)
+                finally:
+                    for _ in chunk:
+                        self._queue.task_done()
+
+    def _notify_write(self, collection_name: str, records: list):
+        if self.on_write is None:
+            return
+        try:
+            self.on_write(collection_name, records)
+        except Exception:
+            traceback.print_exc()
+
+    def _spill_file(self, collection_name: str) -> str:
+        if collection_name == self.collection_name:
+            return self.spill_path
+        root, ext = os.path.splitext(self.spill_path)
+        return f"{root}.{collection_name}{ext}"
+
+    def _spill(self, collection_name: str, records: list):
+        try:
+            with self._spill_lock, open(self._spill_file(collection_name), "a", encoding="utf-8") as spill_file:
+                for record in records:
+                    spill_file.write(json_util.dumps(record) + "\n")
+            self._increment("spilled", len(records))
+        except Exception:
+            traceback.print_exc()
+            self._increment("dropped", len(records))
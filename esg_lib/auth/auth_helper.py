@@ -1,18 +1,56 @@
 from flask import g
+from flask import current_app as app, has_app_context
 from esg_lib.auth.user import User
+from esg_lib.auth.user_cache import get_user_cache, invalidate_user
+
+# Fields needed by token_required and the audit logger, loaded alone when AUTH_USER_FIELDS is set
+USER_AUTH_PROJECTION = {
+    "email": 1,
+    "fullname": 1,
+    "role": 1,
+    "is_principal": 1,
+    "principal_email": 1,
+}
 
 
 class AuthHelper:
+    # None keeps loading the whole user document into g.auth_user
+    user_projection = None
+
+    @classmethod
+    def get_user_projection(cls):
+        """
+        Returns None (whole document) unless a projection is configured: ``user_projection``
+        or ``AUTH_USER_FIELDS``, the extra fields loaded on top of ``USER_AUTH_PROJECTION``.
+        """
+        extra_fields = app.config.get("AUTH_USER_FIELDS") if has_app_context() else None
+        if cls.user_projection is None and extra_fields is None:
+            return None
+        return {**(cls.user_projection or USER_AUTH_PROJECTION), **{field: 1 for field in extra_fields or []}}
+
+    @staticmethod
+    def invalidate_user(email=None):
+        invalidate_user(email)
+
     @staticmethod
     def get_logged_in_user():
         user_email = g.decoded_token['preferred_username'].lower()
         if not isinstance(user_email, str):
             return {"status": "fail", "message": "No email found"}, 400
-        
-        user = User().db().find_one({'email': user_email})
-        
+
+        user_cache = get_user_cache(app.config if has_app_context() else None)
+        user = user_cache.get(user_email) if user_cache else None
+        # User() sets g.table_name on a miss, keep requests audited the same way on a hit
+        g.table_name = User.__TABLE__
+
+        if user is None:
+            user = User().db().find_one({'email': user_email}, AuthHelper.get_user_projection())
+            if user and user_cache:
+                user_cache.set(user_email, user)
+
         if not user:
             return {"status": "fail", "message": "No such user with the provided email"}, 404
 
+        user = dict(user)
         g.auth_user = {**user, "principal_email": user.get("email", "") if user.get("is_principal", False) else  user.get("principal_email", "")}
         return user, 200
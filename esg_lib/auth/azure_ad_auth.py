@@ -1,6 +1,5 @@
 import base64
 import traceback
-import requests
 import jwt
 
 from flask import request
@@ -9,12 +8,22 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
 
+from esg_lib.auth.jwks import (
+    JWKSManager,
+    DEFAULT_TTL,
+    DEFAULT_TIMEOUT,
+    DEFAULT_NEGATIVE_TTL,
+    DEFAULT_MIN_REFRESH_INTERVAL,
+)
+from esg_lib.auth.token_cache import TokenCache, DEFAULT_MAX_TTL
+
 class AzureADAuth:
     _instance = None
     client_id = None
     authority = None
     jwks_uri = None
-    keys = None
+    key_set = None
+    token_cache = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -30,36 +39,50 @@ class AzureADAuth:
             cls._instance.client_id = app.config['AZURE_CLIENT_ID']
             cls._instance.authority = app.config['AZURE_AUTHORITY']
             cls._instance.jwks_uri = f"{app.config['AZURE_AUTHORITY']}/discovery/v2.0/keys"
-            cls._instance.keys = cls._instance.fetch_public_keys()
+            if app.config.get("AUTH_TOKEN_CACHE_SIZE"):
+                cls._instance.token_cache = TokenCache(
+                    app.config["AUTH_TOKEN_CACHE_SIZE"],
+                    app.config.get("AUTH_TOKEN_CACHE_TTL", DEFAULT_MAX_TTL),
+                )
+            cls._instance.key_set = JWKSManager(
+                cls._instance.jwks_uri,
+                key_builder=cls._instance.construct_rsa_public_key,
+                ttl=app.config.get("AZURE_JWKS_TTL", DEFAULT_TTL),
+                timeout=app.config.get("AZURE_JWKS_TIMEOUT", DEFAULT_TIMEOUT),
+                negative_ttl=app.config.get("AZURE_JWKS_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL),
+                min_refresh_interval=app.config.get("AZURE_JWKS_MIN_REFRESH_INTERVAL", DEFAULT_MIN_REFRESH_INTERVAL),
+                on_refresh=cls.invalidate_token_cache,
+            )
+            cls._instance.key_set.refresh()
 
     @classmethod
     def create_instance(cls):
         instance = cls.__new__(cls)
         instance._initialize()
     
+    @property
+    def keys(self):
+        return self.key_set.keys if self.key_set else None
+
+    @property
+    def public_keys(self):
+        return self.key_set.public_keys if self.key_set else {}
+
     def fetch_public_keys(self):
-        try:
-            response = requests.get(self.jwks_uri)
-            if response.status_code != 200:
-                raise Exception("Failed to fetch public keys")
-            
-            return response.json()["keys"]
-        except requests.exceptions.RequestException as e:
-            traceback.print_exc()
-            return None
-        except Exception as e:
-            traceback.print_exc()
-            return None
+        return self.key_set.fetch()
 
-    def construct_rsa_pem(self, key):
+    def construct_rsa_public_key(self, key):
         # Decode base64url encoded n and e components
         n_bytes = base64.urlsafe_b64decode(key["n"] + "==")
         e_bytes = base64.urlsafe_b64decode(key["e"] + "==")
 
-        # Construct RSA key in PEM format
         n = int.from_bytes(n_bytes, byteorder="big")
         e = int.from_bytes(e_bytes, byteorder="big")
-        rsa_key = rsa.RSAPublicNumbers(e, n).public_key(default_backend())
+        return rsa.RSAPublicNumbers(e, n).public_key(default_backend())
+
+    def construct_rsa_pem(self, key):
+        # Construct RSA key in PEM format
+        rsa_key = self.construct_rsa_public_key(key)
         rsa_key_pem = rsa_key.public_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo
@@ -68,30 +91,25 @@ class AzureADAuth:
 
     @classmethod
     def get_key(cls, kid):
-        def find_key():
-            return next((key for key in cls._instance.keys if key["kid"] == kid), None)
-        
-        key = find_key()
-        if key:
-            return key
+        cls.get_public_key(kid)
+        return next(key for key in cls._instance.keys if key["kid"] == kid)
 
-        cls._instance.keys = cls._instance.fetch_public_keys()
-        key = find_key()
+    @classmethod
+    def get_public_key(cls, kid):
+        key = cls._instance.key_set.get(kid)
         if key:
             return key
 
+        if not cls._instance.keys:
+            raise Exception("RSA keys not available")
         raise Exception("RSA key not found")
     
     
     @classmethod
     def get_rsa_key(cls, token):
-        if not cls._instance.keys:
-            raise Exception("RSA keys not available")
-        
         headers = jwt.get_unverified_header(token)
         try:
-            key = cls.get_key(headers["kid"])
-            return cls._instance.construct_rsa_pem(key)
+            return cls.get_public_key(headers["kid"])
         except Exception as e:
             traceback.print_exc()
             raise Exception(f"Failed to get RSA key: {str(e)}")
@@ -116,10 +134,21 @@ class AzureADAuth:
         token = parts[1]
         return token
 
+    @classmethod
+    def invalidate_token_cache(cls, token=None):
+        if cls._instance is not None and cls._instance.token_cache:
+            cls._instance.token_cache.invalidate(token)
+
     @classmethod
     def decode_token(cls):
         cls.create_instance()
         token = cls._instance.get_token_auth_header()
+        token_cache = cls._instance.token_cache
+        if token_cache:
+            cached = token_cache.get(token)
+            if cached:
+                return dict(cached)
+
         rsa_key = cls._instance.get_rsa_key(token)
         try:
             decoded_token = jwt.decode(
@@ -129,6 +158,8 @@ class AzureADAuth:
                 audience=cls._instance.client_id,  
                 issuer=f"{cls._instance.authority}/v2.0"  
             )
+            if token_cache:
+                token_cache.set(token, dict(decoded_token))
             return decoded_token
         except jwt.ExpiredSignatureError:
             raise Exception("Token has expired")
@@ -3,9 +3,12 @@ import jwt
 from flask import request
 from flask import current_app as app, has_app_context
 
+from esg_lib.auth.token_cache import TokenCache, DEFAULT_MAX_TTL
+
 class ExternalAuth:
     _instance = None
     secret_key = None
+    token_cache = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -19,6 +22,11 @@ class ExternalAuth:
 
         if cls._instance.secret_key is None:
             cls._instance.secret_key = app.config['SECRET_KEY']
+            if app.config.get("AUTH_TOKEN_CACHE_SIZE"):
+                cls._instance.token_cache = TokenCache(
+                    app.config["AUTH_TOKEN_CACHE_SIZE"],
+                    app.config.get("AUTH_TOKEN_CACHE_TTL", DEFAULT_MAX_TTL),
+                )
 
     @classmethod
     def create_instance(cls):
@@ -44,13 +52,26 @@ class ExternalAuth:
         token = parts[1]
         return token
 
+    @classmethod
+    def invalidate_token_cache(cls, token=None):
+        if cls._instance is not None and cls._instance.token_cache:
+            cls._instance.token_cache.invalidate(token)
+
     @classmethod
     def decode_token(cls):
         cls.create_instance()
 
         token = cls._instance.get_token_auth_header()
+        token_cache = cls._instance.token_cache
+        if token_cache:
+            cached = token_cache.get(token)
+            if cached:
+                return dict(cached)
+
         try:
             decoded_token = jwt.decode(token, cls._instance.secret_key, algorithms=['HS256'])
+            if token_cache:
+                token_cache.set(token, dict(decoded_token))
             return decoded_token
         except jwt.ExpiredSignatureError:
             raise Exception("Token has expired")
@@ -0,0 +1,159 @@
+import threading
+import time
+import traceback
+
+import requests
+
+DEFAULT_TTL = 3600
+DEFAULT_TIMEOUT = 5
+DEFAULT_NEGATIVE_TTL = 300
+DEFAULT_MIN_REFRESH_INTERVAL = 30
+MAX_NEGATIVE_ENTRIES = 1024
+
+
+class JWKSManager:
+    """
+    Keeps a JWKS key set and the public keys built from it.
+
+    - Keys older than ``ttl`` are still served while a background thread refreshes them.
+    - Concurrent refreshes are deduplicated: one thread fetches, the others wait for it.
+    - Misses for unknown kids trigger at most one fetch per ``min_refresh_interval``.
+      Kids missing from a key set fetched for them are remembered for ``negative_ttl`` seconds.
+    - Every HTTP call is bounded by ``timeout``.
+    """
+
+    def __init__(
+        self,
+        jwks_uri: str,
+        key_builder=None,
+        ttl: float = DEFAULT_TTL,
+        timeout: float = DEFAULT_TIMEOUT,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        min_refresh_interval: float = DEFAULT_MIN_REFRESH_INTERVAL,
+        on_refresh=None,
+    ):
+        self.jwks_uri = jwks_uri
+        self.key_builder = key_builder or (lambda key: key)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.on_refresh = on_refresh
+
+        self.keys = None
+        self.public_keys = {}
+        self.fetched_at = None
+        self.last_attempt = None
+
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._unknown_kids = {}
+
+    def get(self, kid):
+        """
+        Returns the public key for ``kid`` or None if the key set does not contain it.
+        """
+        key = self.public_keys.get(kid)
+        if key is not None:
+            if self.is_stale():
+                self.refresh_in_background()
+            return key
+
+        if self._is_known_unknown(kid):
+            return None
+
+        loaded = self.refresh()
+        key = self.public_keys.get(kid)
+        # Only a key set fetched for this miss proves the kid unknown, not a skipped or failed fetch
+        if key is None and loaded:
+            self._remember_unknown(kid)
+        return key
+
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or time.monotonic() - self.fetched_at >= self.ttl
+
+    def refresh(self, wait: bool = True) -> bool:
+        """
+        Fetches the key set unless a fetch is already running or one was attempted
+        less than ``min_refresh_interval`` seconds ago. Returns True if keys were replaced.
+        """
+        with self._lock:
+            inflight = self._inflight
+            if inflight is None:
+                if self._rate_limited():
+                    return False
+                self.last_attempt = time.monotonic()
+                inflight = self._inflight = threading.Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            if wait:
+                inflight.wait(self.timeout)
+            return False
+
+        try:
+            return self._load()
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
+
+    def _rate_limited(self) -> bool:
+        return self.last_attempt is not None and time.monotonic() - self.last_attempt < self.min_refresh_interval
+
+    def refresh_in_background(self):
+        if self._inflight is not None or self._rate_limited():
+            return
+        threading.Thread(target=self.refresh, kwargs={"wait": False}, name="jwks-refresh", daemon=True).start()
+
+    def fetch(self):
+        try:
+            response = requests.get(self.jwks_uri, timeout=self.timeout)
+            if response.status_code != 200:
+                raise Exception("Failed to fetch public keys")
+
+            return response.json()["keys"]
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def _load(self) -> bool:
+        keys = self.fetch()
+        if keys is None:
+            return False
+
+        public_keys = {}
+        for key in keys:
+            try:
+                public_keys[key["kid"]] = self.key_builder(key)
+            except Exception:
+                traceback.print_exc()
+
+        changed = set(public_keys) != set(self.public_keys)
+        self.keys = keys
+        self.public_keys = public_keys
+        self.fetched_at = time.monotonic()
+
+        with self._lock:
+            self._unknown_kids = {
+                kid: expires_at for kid, expires_at in self._unknown_kids.items() if kid not in public_keys
+            }
+
+        if changed and self.on_refresh:
+            self.on_refresh()
+        return True
+
+    def _is_known_unknown(self, kid) -> bool:
+        expires_at = self._unknown_kids.get(kid)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def _remember_unknown(self, kid):
+        with self._lock:
+            if len(self._unknown_kids) >= MAX_NEGATIVE_ENTRIES:
+                now = time.monotonic()
+                self._unknown_kids = {k: v for k, v in self._unknown_kids.items() if v > now}
+                if len(self._unknown_kids) >= MAX_NEGATIVE_ENTRIES:
+                    self._unknown_kids.clear()
+            self._unknown_kids[kid] = time.monotonic() + self.negative_ttl
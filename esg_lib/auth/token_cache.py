@@ -0,0 +1,45 @@
+import hashlib
+import time
+
+from esg_lib.cache import TTLCache
+
+DEFAULT_MAX_TTL = 300
+
+
+class TokenCache:
+    """
+    Maps the SHA-256 digest of a verified token to its decoded claims.
+
+    Entries expire at the token's ``exp`` claim, capped at ``max_ttl`` seconds,
+    so a cached token is never accepted after it has expired.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float = DEFAULT_MAX_TTL):
+        self.max_ttl = max_ttl
+        self._cache = TTLCache(max_entries=max_entries, ttl=max_ttl)
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str):
+        return self._cache.get(self.digest(token))
+
+    def set(self, token: str, claims: dict):
+        expires_at = time.time() + self.max_ttl
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        self._cache.set(self.digest(token), claims, expires_at=expires_at)
+
+    def invalidate(self, token: str = None):
+        """
+        Removes one token, or every cached token when called without arguments
+        (e.g. after a signing key rotation).
+        """
+        if token is None:
+            self._cache.clear()
+        else:
+            self._cache.delete(self.digest(token))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
@@ -1,4 +1,5 @@
 from esg_lib.document import Document
+from esg_lib.auth.user_cache import invalidate_user
 
 
 class User(Document):
@@ -7,3 +8,12 @@ class User(Document):
     _id = None
     email = None
     role = None
+
+
+def _invalidate_user_cache(collection_name, ids=None):
+    # Writes only report ids while the cache is keyed by email, so any user write clears it
+    if collection_name == User.__TABLE__:
+        invalidate_user()
+
+
+Document.add_write_listener(_invalidate_user_cache)
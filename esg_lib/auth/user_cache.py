@@ -0,0 +1,122 @@
+from bson import json_util
+
+from esg_lib.cache import TTLCache
+
+DEFAULT_USER_CACHE_SIZE = 1024
+DEFAULT_USER_CACHE_TTL = 60
+
+
+class UserCacheBackend:
+    """
+    Interface for caches used by ``AuthHelper.get_logged_in_user``. Keys are lower-cased emails.
+    """
+
+    def get(self, email: str):
+        raise NotImplementedError
+
+    def set(self, email: str, user: dict):
+        raise NotImplementedError
+
+    def delete(self, email: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class InMemoryUserCache(UserCacheBackend):
+    """
+    Per-process TTL/LRU user cache.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_USER_CACHE_SIZE, ttl: float = DEFAULT_USER_CACHE_TTL):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, email: str):
+        return self._cache.get(email)
+
+    def set(self, email: str, user: dict):
+        self._cache.set(email, user)
+
+    def delete(self, email: str):
+        self._cache.delete(email)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class SharedUserCache(UserCacheBackend):
+    """
+    User cache shared between processes through a key-value store.
+
+    ``client`` only needs the redis-py style ``get``, ``set(key, value, ex=...)``,
+    ``delete`` and ``scan_iter`` methods, so a local fake can stand in for it.
+    """
+
+    def __init__(self, client, ttl: float = DEFAULT_USER_CACHE_TTL, prefix: str = "esg:user:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, email: str) -> str:
+        return f"{self.prefix}{email}"
+
+    def get(self, email: str):
+        raw = self.client.get(self._key(email))
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return json_util.loads(raw)
+
+    def set(self, email: str, user: dict):
+        self.client.set(self._key(email), json_util.dumps(user), ex=max(int(self.ttl), 1))
+
+    def delete(self, email: str):
+        self.client.delete(self._key(email))
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+_backend = None
+_configured = False
+
+
+def set_user_cache(backend: UserCacheBackend = None):
+    """
+    Installs the user cache backend. ``None`` disables caching.
+    """
+    global _backend, _configured
+    _backend = backend
+    _configured = True
+
+
+def get_user_cache(config=None):
+    """
+    Returns the installed backend. On first use an ``InMemoryUserCache`` is created
+    from ``AUTH_USER_CACHE_TTL``/``AUTH_USER_CACHE_SIZE`` (a TTL of 0 disables it).
+    """
+    if not _configured and config is not None:
+        ttl = config.get("AUTH_USER_CACHE_TTL", DEFAULT_USER_CACHE_TTL)
+        set_user_cache(
+            InMemoryUserCache(config.get("AUTH_USER_CACHE_SIZE", DEFAULT_USER_CACHE_SIZE), ttl) if ttl else None
+        )
+    return _backend
+
+
+def invalidate_user(email: str = None):
+    """
+    Drops a cached user, or the whole cache when no email is given.
+    Call it whenever a user document changes outside of ``User.save``/``update``/``delete``.
+    """
+    if _backend is None:
+        return
+    if email:
+        _backend.delete(email.lower())
+    else:
+        _backend.clear()
@@ -1,14 +1,33 @@
+import traceback
+from itertools import islice
+
 import inject
 from flask_pymongo import PyMongo
 from flask import g
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 
 from esg_lib.utils import generate_id
 
+DEFAULT_BULK_BATCH_SIZE = 1000
+
+
+class BaseDocument:
+    """
+    Persistence methods shared by ``Document`` and ``SchemaDocument``. Its empty slots
+    let ``SchemaDocument`` instances go without a ``__dict__``.
+    """
+
+    __slots__ = ()
 
-class Document:
     __TABLE__ = None
+    # pymongo read preference used by db(), None for the client default
+    __READ_PREFERENCE__ = None
     _id = None
 
+    _collections = {}
+    _write_listeners = []
+
     def __init__(self, **kwargs):
         g.table_name = self.__TABLE__
         for k, v in kwargs.items():
@@ -23,29 +42,149 @@ class Document:
         self._id = value
 
     @classmethod
-    def get_collection(cls, collection_name):
-        mongo = inject.instance(PyMongo)
-        return mongo.db[collection_name]
+    def get_collection(cls, collection_name, read_preference=None):
+        key = (collection_name, repr(read_preference) if read_preference else None)
+        collection = BaseDocument._collections.get(key)
+        if collection is None:
+            mongo = inject.instance(PyMongo)
+            collection = mongo.db[collection_name]
+            if read_preference:
+                collection = collection.with_options(read_preference=read_preference)
+            BaseDocument._collections[key] = collection
+        return collection
 
-    def db(self):
-        return self.get_collection(self.__TABLE__)
+    @staticmethod
+    def clear_collection_cache():
+        """
+        Forgets the cached collection handles, e.g. after rebinding PyMongo in the injector.
+        """
+        BaseDocument._collections.clear()
+
+    @staticmethod
+    def add_write_listener(listener):
+        """
+        Registers ``listener(collection_name, ids)``, called after writes made through
+        Document. ``ids`` is None when the written documents are not known one by one.
+        """
+        BaseDocument._write_listeners.append(listener)
+
+    @classmethod
+    def _notify_write(cls, ids=None):
+        for listener in BaseDocument._write_listeners:
+            try:
+                listener(cls.__TABLE__, ids)
+            except Exception:
+                traceback.print_exc()
+
+    def db(self, read_preference=None):
+        """
+        Returns the model collection. ``read_preference`` overrides the model one for reads
+        made through the returned handle; writes always go to the primary.
+        """
+        return self.get_collection(self.__TABLE__, read_preference or self.__READ_PREFERENCE__)
 
     def save(self):
         if not self._id:
             self._id = generate_id()
-        self._id = self.db().save(self.to_dict())
+        self.db().replace_one({"_id": self._id}, self.to_dict(), upsert=True)
+        self._notify_write([self._id])
         return self
 
     def save_all(self, items, **kwargs):
         kwargs = kwargs or {}
         items = [{"_id": generate_id(), **item, **kwargs} for item in items]
         self.db().insert_many(items)
+        self._notify_write()
         return items
 
-    def load(self, query=None):
+    @staticmethod
+    def _to_write_operation(item, upsert_keys, extra):
+        if not isinstance(item, dict):
+            return item
+
+        item = {**item, **extra}
+        if not upsert_keys:
+            return InsertOne({"_id": generate_id(), **item})
+
+        _id = item.pop("_id", None) or generate_id()
+        return UpdateOne(
+            {key: item.get(key) for key in upsert_keys},
+            {"$set": item, "$setOnInsert": {"_id": _id}},
+            upsert=True,
+        )
+
+    @classmethod
+    def bulk_write(cls, items, batch_size=DEFAULT_BULK_BATCH_SIZE, ordered=False, upsert_key=None, **kwargs):
+        """
+        Writes an iterable (or generator) of items with ``bulk_write``, ``batch_size`` at a time,
+        so the whole input is never held in memory.
+
+        Args:
+            items: pymongo write operations (``InsertOne``, ``UpdateOne``, ``ReplaceOne``...),
+                sent as is, or dicts. Dicts are inserted with a generated ``_id``, or
+                upserted on ``upsert_key`` when it is given.
+            batch_size (int): Number of operations per ``bulk_write`` call.
+            ordered (bool): Stop at the first error instead of writing every operation.
+            upsert_key (str | list): Field(s) identifying the document to upsert for dict items.
+            **kwargs: Values merged into every dict item, like ``save_all``.
+
+        Returns:
+            list: One dict per batch with its counts and ``errors`` (write errors whose
+            ``index`` is the position of the item in ``items``).
+        """
+        if isinstance(upsert_key, str):
+            upsert_key = [upsert_key]
+
+        collection = cls().db()
+        operations = (cls._to_write_operation(item, upsert_key, kwargs) for item in items)
+        results = []
+        offset = 0
+
+        while True:
+            batch = list(islice(operations, batch_size))
+            if not batch:
+                break
+
+            result = {"batch": len(results), "size": len(batch), "errors": []}
+            try:
+                bulk_result = collection.bulk_write(batch, ordered=ordered)
+                result.update(
+                    inserted=bulk_result.inserted_count,
+                    matched=bulk_result.matched_count,
+                    modified=bulk_result.modified_count,
+                    upserted=bulk_result.upserted_count,
+                    deleted=bulk_result.deleted_count,
+                )
+            except BulkWriteError as e:
+                details = e.details
+                result.update(
+                    inserted=details.get("nInserted", 0),
+                    matched=details.get("nMatched", 0),
+                    modified=details.get("nModified", 0),
+                    upserted=details.get("nUpserted", 0),
+                    deleted=details.get("nRemoved", 0),
+                    errors=[{**error, "index": offset + error["index"]} for error in details.get("writeErrors", [])],
+                )
+
+            results.append(result)
+            offset += len(batch)
+            if ordered and result["errors"]:
+                break
+
+        cls._notify_write()
+        return results
+
+    @classmethod
+    def from_mongo(cls, data: dict):
+        """
+        Builds an instance from a raw MongoDB document.
+        """
+        return cls(**data)
+
+    def load(self, query=None, read_preference=None):
         if not query:
             query = {"_id": self._id}
-        self.from_dict(self.db().find_one(query))
+        self.from_dict(self.db(read_preference).find_one(query))
         return self
 
     def delete(self, query=None):
@@ -53,35 +192,200 @@ class Document:
             if not query:
                 query = {"_id": self._id}
             self.db().remove(query)
+            self._notify_write(None if query != {"_id": self._id} else [self._id])
         return self
 
-    def to_dict(self):
-        return self.__dict__
-
-    def from_dict(self, d):
-        if d:
-            self.__dict__ = d
-        else:
-            self._id = None
-        return self
+    @classmethod
+    def get_all(cls, query=None, **kwargs):
+        """
+        Returns every matching document as a list. Accepts the same options as ``iter``.
+        """
+        return list(cls.iter(query, **kwargs))
 
     @classmethod
-    def get_all(cls, query=None):
+    def iter(cls, query=None, projection=None, sort=None, limit=0, batch_size=None, raw=False, read_preference=None):
+        """
+        Streams matching documents from a server-side cursor, creating instances one at a time.
+
+        Args:
+            query (dict, optional): MongoDB filter. Defaults to every document.
+            projection (dict | list, optional): Fields to fetch.
+            sort (list, optional): ``[(field, direction), ...]`` sort specification.
+            limit (int, optional): Maximum number of documents, 0 for no limit.
+            batch_size (int, optional): Number of documents fetched per round trip.
+            raw (bool, optional): Yield the raw dicts instead of model instances.
+            read_preference (optional): pymongo read preference for this query, e.g.
+                ``get_secondary_read_preference()`` for reports.
+        """
         if query is None:
             query = {}
-        return [cls(**r) for r in cls().db().find(query)]
+
+        cursor = cls().db(read_preference).find(query, projection, sort=sort, limit=limit)
+        if batch_size:
+            cursor = cursor.batch_size(batch_size)
+
+        if raw:
+            yield from cursor
+            return
+
+        for r in cursor:
+            yield cls.from_mongo(r)
 
     @classmethod
     def drop(cls):
-        return cls().db().drop()
+        result = cls().db().drop()
+        cls._notify_write()
+        return result
 
     @classmethod
     def delete_all(cls, query):
         if query:
             cls().db().delete_many(query)
+            cls._notify_write()
 
     def update(self, data: dict):
         self.db().update_one({"_id": self._id}, {"$set": data})
+        self._notify_write([self._id])
         # for k, v in data.items():
         #     self.__setattr__(k, v)
         # return self
+
+
+class Document(BaseDocument):
+    def to_dict(self):
+        return self.__dict__
+
+    def from_dict(self, d):
+        if d:
+            self.__dict__ = d
+        else:
+            self._id = None
+        return self
+
+
+class SchemaDocumentMeta(type):
+    """
+    Turns the plain class attributes of a ``SchemaDocument`` subclass into slots.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        inherited = {}
+        for base in reversed(bases):
+            inherited.update(getattr(base, "__FIELDS__", {}))
+
+        own = {}
+        for key, value in list(namespace.items()):
+            if key.startswith("__") or callable(value) or isinstance(value, (property, classmethod, staticmethod)):
+                continue
+            own[key] = namespace.pop(key)
+
+        namespace["__FIELDS__"] = {**inherited, **own}
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + tuple(
+            key for key in own if key not in inherited
+        )
+        cls = super().__new__(mcs, name, bases, namespace)
+
+        cls.__SETTERS__ = {
+            key: getattr(cls, key).__set__ for key in list(cls.__FIELDS__) + ["_extra"]
+        }
+        return cls
+
+
+class SchemaDocument(BaseDocument, metaclass=SchemaDocumentMeta):
+    """
+    Opt-in alternative to ``Document`` for models with a declared schema.
+
+    Every plain class attribute is a field with that attribute as its default, and is
+    stored in a slot instead of a per-instance ``__dict__``. Undeclared keys are kept
+    in ``_extra`` so documents still round-trip through ``to_dict``/``from_dict``.
+
+    Example:
+        class AuditLog(SchemaDocument):
+            __TABLE__ = "audit"
+
+            action = None
+            created_on = None
+    """
+
+    __slots__ = ("_extra",)
+
+    _id = None
+
+    def __init__(self, **kwargs):
+        g.table_name = self.__TABLE__
+        self._set_fields(kwargs)
+
+    @classmethod
+    def from_mongo(cls, data: dict):
+        """
+        Fast constructor: fills the slots directly and skips ``__init__``.
+        """
+        obj = cls.__new__(cls)
+        setters = cls.__SETTERS__
+        extra = None
+        for k, v in data.items():
+            setter = setters.get(k)
+            if setter is None:
+                if extra is None:
+                    extra = {}
+                extra[k] = v
+            else:
+                setter(obj, v)
+        setters["_extra"](obj, extra)
+        return obj
+
+    def _set_fields(self, data: dict):
+        setters = self.__SETTERS__
+        extra = None
+        for k, v in data.items():
+            setter = setters.get(k)
+            if setter is None:
+                if extra is None:
+                    extra = {}
+                extra[k] = v
+            else:
+                setter(self, v)
+        setters["_extra"](self, extra)
+
+    def __getattr__(self, name):
+        # Only called for unset slots and undeclared attributes
+        if name == "_extra":
+            return None
+        fields = type(self).__FIELDS__
+        if name in fields:
+            return fields[name]
+        extra = self._extra
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in self.__SETTERS__ or isinstance(getattr(type(self), name, None), property):
+            object.__setattr__(self, name, value)
+        else:
+            if self._extra is None:
+                self.__SETTERS__["_extra"](self, {})
+            self._extra[name] = value
+
+    def to_dict(self):
+        data = {}
+        for name in self.__FIELDS__:
+            try:
+                data[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def from_dict(self, d):
+        if d:
+            for name in self.__FIELDS__:
+                try:
+                    object.__delattr__(self, name)
+                except AttributeError:
+                    pass
+            self._set_fields(d)
+        else:
+            self._id = None
+        return self
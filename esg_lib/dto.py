@@ -70,6 +70,19 @@ class AuditDto:
             "page": fields.Integer,
             "size": fields.Integer,
             "total": fields.Integer,
+            "total_capped": NullableBoolean(),
+            "next_cursor": NullableString(),
             "content": fields.List(fields.Nested(audit_info), skip_none=True),
         },
     )
+
+    audit_rollup = api.model(
+        "Audit activity",
+        {
+            "bucket": fields.DateTime(),
+            "collection": NullableString(),
+            "action": NullableString(),
+            "user_email": NullableString(),
+            "count": fields.Integer,
+        },
+    )
@@ -1,5 +1,12 @@
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_app_context
+
+from esg_lib.cache import TTLCache
 from esg_lib.document import Document
+from esg_lib.mongo import get_secondary_read_preference
 
 collections = {
     "axe": "axes",
@@ -10,6 +17,56 @@ collections = {
     "group": "groups",
 }
 
+# Tables whose reference fields are searched by name but stored as ids
+NAME_LOOKUP_TABLES = [
+    "forms",
+    "projects",
+    "permanent_actions",
+    "highlighted_actions",
+    "campaigns",
+    "carbon_campaigns",
+]
+NAME_LOOKUP_FIELDS = [
+    "axe",
+    "engagement",
+    "objective",
+    "entity",
+    "group",
+    "entities",
+]
+
+# Pass as ``collation`` (with an index built using the same collation) to get
+# case-insensitive equality for strict ``EQUALS``/``IN`` filters
+CASE_INSENSITIVE_COLLATION = {"locale": "en", "strength": 2}
+
+name_ids_cache = None
+_lookup_executor = None
+_lookup_executor_lock = threading.Lock()
+
+
+def _get_lookup_executor() -> ThreadPoolExecutor:
+    global _lookup_executor
+    with _lookup_executor_lock:
+        if _lookup_executor is None:
+            _lookup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="filter-lookups")
+        return _lookup_executor
+
+
+def configure_name_cache(ttl: float = 30, max_entries: int = 1024):
+    """
+    Enables a short-lived cache of name -> ids lookups. A falsy ``ttl`` disables it.
+    """
+    global name_ids_cache
+    name_ids_cache = TTLCache(max_entries=max_entries, ttl=ttl) if ttl else None
+
+
+def _invalidate_name_cache(collection_name, ids=None):
+    if name_ids_cache is not None and collection_name in collections.values():
+        name_ids_cache.clear()
+
+
+Document.add_write_listener(_invalidate_name_cache)
+
 
 def get_ids_by_name(collection, name_field, id_field, name_value):
     """
@@ -26,55 +83,197 @@ def get_ids_by_name(collection, name_field, id_field, name_value):
 
 def get_collection(field_code):
     collection_name = collections.get(field_code, field_code)
-    return Document.get_collection(collection_name)
+    return Document.get_collection(collection_name, get_secondary_read_preference())
+
+
+def _matches_name(pattern, name) -> bool:
+    if isinstance(name, list):
+        return any(_matches_name(pattern, n) for n in name)
+    return isinstance(name, str) and pattern.search(name) is not None
 
 
-def build_filters(filters):
+def _fetch_ids_by_names(collection_name: str, values: list, read_preference=None) -> dict:
+    """
+    Resolves several names against one collection with a single ``$or`` query.
+    """
+    collection = Document.get_collection(collection_name, read_preference)
+    if len(values) == 1:
+        return {values[0]: get_ids_by_name(collection, "name", "_id", values[0])}
+
+    try:
+        patterns = {value: re.compile(value, re.IGNORECASE) for value in values}
+    except re.error:
+        return {value: get_ids_by_name(collection, "name", "_id", value) for value in values}
+
+    results = {value: [] for value in values}
+    documents = collection.find(
+        {"$or": [{"name": {"$regex": value, "$options": "i"}} for value in values]},
+        {"_id": 1, "name": 1},
+    )
+    for document in documents:
+        for value, pattern in patterns.items():
+            if _matches_name(pattern, document.get("name")):
+                results[value].append(document["_id"])
+    return results
+
+
+def resolve_ids_by_names(lookups: dict) -> dict:
+    """
+    Resolves name lookups grouped by collection.
+
+    :param lookups: Mapping of collection name to the set of names to resolve.
+    :return: Mapping of ``(collection name, name)`` to the matching ids.
+    """
+    memo = g.setdefault("name_ids_lookups", {}) if has_app_context() else {}
+    # Resolved here because the executor threads have no app context
+    read_preference = get_secondary_read_preference()
+    resolved = {}
+    pending = {}
+
+    for collection_name, values in lookups.items():
+        for value in values:
+            key = (collection_name, value)
+            ids = memo.get(key)
+            if ids is None and name_ids_cache is not None:
+                ids = name_ids_cache.get(key)
+            if ids is None:
+                pending.setdefault(collection_name, []).append(value)
+            else:
+                resolved[key] = ids
+
+    if len(pending) > 1:
+        executor = _get_lookup_executor()
+        futures = {
+            name: executor.submit(_fetch_ids_by_names, name, values, read_preference)
+            for name, values in pending.items()
+        }
+        fetched = {name: future.result() for name, future in futures.items()}
+    else:
+        fetched = {name: _fetch_ids_by_names(name, values, read_preference) for name, values in pending.items()}
+
+    for collection_name, results in fetched.items():
+        for value, ids in results.items():
+            key = (collection_name, value)
+            resolved[key] = memo[key] = ids
+            if name_ids_cache is not None:
+                name_ids_cache.set(key, ids)
+
+    return resolved
+
+
+def _parse_filter_item(filter_item):
+    # Extract filter components
+    table_name, field_info = filter_item.get("field", [None, {}])
+    field_code = field_info.get("code", None)
+    field_type = field_info.get("type", None)
+    operator = filter_item.get("operator", None)
+    value = filter_item.get("value", None)
+
+    if not table_name:
+        raise ValueError("No table name")
+    if not field_code:
+        raise ValueError("No columns name")
+    if not field_type:
+        raise ValueError("No field type")
+    if not operator:
+        raise ValueError("No operator")
+    if value != 0 and not value:  # Allow 0 as a valid value
+        raise ValueError("No value provided.")
+
+    return table_name, field_code, operator, value
+
+
+def _is_name_lookup(table_name, field_code) -> bool:
+    return table_name in NAME_LOOKUP_TABLES and field_code in NAME_LOOKUP_FIELDS
+
+
+def _is_simple_collation(collation) -> bool:
+    return not collation or collation.get("locale") == "simple"
+
+
+def _index_eligibility(table_name, field_code, operator, strict=False, collation=None):
+    if _is_name_lookup(table_name, field_code):
+        return True, "$in on resolved ids"
+    if table_name == "users" and field_code == "has_backup":
+        return False, "$ne null is not selective"
+    if operator in ["BEFORE", "AFTER", "GREATER THAN", "LESS THAN"]:
+        return True, "range"
+    if operator == "EQUALS":
+        return True, "equality"
+    if operator == "NOT EQUALS":
+        return False, "$ne is not selective"
+    if operator == "CONTAINS":
+        if strict and not _is_simple_collation(collation):
+            # $regex ignores the collation, so collated indexes cannot serve it
+            return False, "prefix regex under a non-simple collation"
+        if strict:
+            return True, "anchored prefix regex"
+        return False, "unanchored case-insensitive regex"
+    if operator == "IN":
+        if strict:
+            return True, "$in on exact values"
+        return False, "$in on case-insensitive regexes"
+    return False, "unsupported operator"
+
+
+def explain_filters(filters, strict=False, collation=None) -> list:
+    """
+    Reports which filters compile to index-eligible conditions, without querying the database.
+
+    :param filters: Array containing filter information.
+    :param strict: Whether the filters would be compiled in strict mode.
+    :param collation: Collation the query runs with (and its indexes are built with).
+    :return: One ``{"field", "operator", "index_eligible", "reason"}`` dict per filter.
+    """
+    report = []
+    for table_name, field_code, operator, value in (_parse_filter_item(f) for f in filters):
+        eligible, reason = _index_eligibility(table_name, field_code, operator, strict, collation)
+        report.append(
+            {
+                "field": field_code,
+                "operator": operator,
+                "index_eligible": eligible,
+                "reason": reason,
+            }
+        )
+    return report
+
+
+def build_filters(filters, strict=False):
     """
     Converts the filters object into a MongoDB query.
 
+    In strict mode, operators are compiled to index-friendly conditions: ``CONTAINS``
+    becomes an anchored, case-sensitive prefix match and ``IN`` a plain ``$in`` on the
+    given values. Run strict queries with ``CASE_INSENSITIVE_COLLATION`` to keep
+    case-insensitive equality.
+
+    Strict ``CONTAINS`` changes the matching itself: "contains, ignoring case" becomes
+    "starts with, same case". ``$regex`` ignores collations, so it stays case-sensitive
+    under ``CASE_INSENSITIVE_COLLATION`` and cannot use the collated indexes.
+
     :param filters: Array containing filter information.
+    :param strict: Compile to index-eligible conditions where the semantics allow it.
     :return: MongoDB query as a dictionary.
     """
     mongo_query = {}
+    parsed_filters = [_parse_filter_item(filter_item) for filter_item in filters]
 
-    for filter_item in filters:
-        # Extract filter components
-        table_name, field_info = filter_item.get("field", [None, {}])
-        field_code = field_info.get("code", None)
-        field_type = field_info.get("type", None)
-        operator = filter_item.get("operator", None)
-        value = filter_item.get("value", None)
-
-        if not table_name:
-            raise ValueError("No table name")
-        if not field_code:
-            raise ValueError("No columns name")
-        if not field_type:
-            raise ValueError("No field type")
-        if not operator:
-            raise ValueError("No operator")
-        if value != 0 and not value:  # Allow 0 as a valid value
-            raise ValueError("No value provided.")
+    # Resolve every name -> ids lookup up front, one query per collection
+    lookups = {}
+    for table_name, field_code, operator, value in parsed_filters:
+        if _is_name_lookup(table_name, field_code) and isinstance(value, str):
+            lookups.setdefault(collections.get(field_code, field_code), set()).add(value.strip())
+    resolved_ids = resolve_ids_by_names(lookups) if lookups else {}
 
+    for table_name, field_code, operator, value in parsed_filters:
         # Handle cases where the search is done by name, but the ID is stored in the database
-        if table_name in [
-            "forms",
-            "projects",
-            "permanent_actions",
-            "highlighted_actions",
-            "campaigns",
-            "carbon_campaigns",
-        ] and field_code in [
-            "axe",
-            "engagement",
-            "objective",
-            "entity",
-            "group",
-            "entities",
-        ]:
-            collection = get_collection(field_code)
-            ids_value = get_ids_by_name(collection, "name", "_id", value)
+        if _is_name_lookup(table_name, field_code):
+            ids_value = None
+            if isinstance(value, str):
+                ids_value = resolved_ids.get((collections.get(field_code, field_code), value.strip()))
+            if ids_value is None:
+                ids_value = get_ids_by_name(get_collection(field_code), "name", "_id", value)
             mongo_query[field_code] = {"$in": ids_value}
             continue
 
@@ -102,10 +301,16 @@ def build_filters(filters):
         elif operator == "CONTAINS":
             if not isinstance(value, str):
                 raise ValueError("Value for 'CONTAINS' operator must be a string.")
-            mongo_query[field_code] = {"$regex": value, "$options": "i"}
+            if strict:
+                mongo_query[field_code] = {"$regex": f"^{re.escape(value)}"}
+            else:
+                mongo_query[field_code] = {"$regex": value, "$options": "i"}
         elif operator == "IN":
-            regex_query = [re.compile(v, re.IGNORECASE) for v in value]
-            mongo_query[field_code] = {"$in": regex_query}
+            if strict:
+                mongo_query[field_code] = {"$in": list(value)}
+            else:
+                regex_query = [re.compile(v, re.IGNORECASE) for v in value]
+                mongo_query[field_code] = {"$in": regex_query}
         elif operator == "GREATER THAN":
             mongo_query[field_code] = {"$gt": value}
         elif operator == "LESS THAN":
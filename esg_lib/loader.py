@@ -0,0 +1,164 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_app_context
+
+from esg_lib.document import Document
+from esg_lib.mongo import get_secondary_read_preference
+from esg_lib.reference_cache import reference_cache
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="reference-loader")
+        return _executor
+
+
+def _get_value(obj, field):
+    if isinstance(obj, dict):
+        return obj.get(field)
+    return getattr(obj, field, None)
+
+
+def _set_value(obj, field, value):
+    if isinstance(obj, dict):
+        obj[field] = value
+    else:
+        setattr(obj, field, value)
+
+
+def _projection_key(projection):
+    return tuple(sorted(projection)) if projection else None
+
+
+def _group_key(info: dict) -> tuple:
+    # Collections passed as handles may live in another database, keep them apart
+    source = info.get("source")
+    name = source.full_name if source is not None else info["collection"]
+    return name, _projection_key(info.get("projection"))
+
+
+class ReferenceLoader:
+    """
+    Batched loader replacing "collect ids, one ``$in`` query, map back" helpers.
+
+    ``resolve`` takes a spec mapping each reference field to the collection it points to:
+
+        spec = {
+            "objective": {
+                "collection": "objectives",
+                "projection": ["name", "engagement", "axe"],
+                "fields": {
+                    "engagement": {"collection": "engagements", "projection": ["name"]},
+                    "axe": {"collection": "axes", "projection": ["name"]},
+                },
+            },
+            "entities": {"collection": "entities", "is_list": True, "as": "entities_list"},
+        }
+
+    - "is_list": the field holds a list of ids.
+    - "as": where to put the loaded document(s), defaults to replacing the field.
+    - "fields": nested spec resolved on the loaded documents.
+    - "source": collection handle to query instead of the ``Document`` collection named
+      "collection", e.g. one from another database or client.
+
+    Each level runs one deduplicated ``$in`` query per collection and projection, with
+    independent collections queried concurrently. Loaded documents are memoized for
+    the lifetime of the loader (one request with ``get_request_loader``).
+    """
+
+    def __init__(self):
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def load_many(self, collection_name: str, ids, projection=None, collection=None) -> dict:
+        """
+        Returns ``{id: document}`` for the given ids, querying only the ids not loaded yet.
+        """
+        key = (collection_name, _projection_key(projection))
+        with self._lock:
+            memo = self._memo.setdefault(key, {})
+            missing = [i for i in dict.fromkeys(ids) if i is not None and i not in memo]
+
+        if missing:
+            if collection is None:
+                collection = Document.get_collection(collection_name, get_secondary_read_preference())
+            fields = {field: 1 for field in projection} if projection else None
+            documents = reference_cache.get_many(collection_name, missing, collection=collection, projection=fields)
+            with self._lock:
+                memo.update(documents)
+
+        return {i: memo[i] for i in ids if i in memo}
+
+    def resolve(self, objects: list, spec: dict) -> list:
+        """
+        Replaces the reference ids of ``objects`` (dicts or model instances) following ``spec``.
+        """
+        if not objects:
+            return objects
+
+        # Collect the ids of every field, grouped by collection and projection
+        groups = {}
+        for field, info in spec.items():
+            group = groups.setdefault(
+                _group_key(info),
+                {"projection": info.get("projection"), "source": info.get("source"), "ids": []},
+            )
+            for obj in objects:
+                value = _get_value(obj, field)
+                if info.get("is_list", False):
+                    group["ids"].extend(value or [])
+                elif value is not None:
+                    group["ids"].append(value)
+
+        # Collections are resolved here since executor threads have no app context
+        read_preference = get_secondary_read_preference()
+        tasks = {
+            key: (
+                key[0],
+                group["ids"],
+                group["projection"],
+                group["source"] if group["source"] is not None else Document.get_collection(key[0], read_preference),
+            )
+            for key, group in groups.items()
+        }
+        if len(tasks) > 1:
+            futures = {key: _get_executor().submit(self.load_many, *task) for key, task in tasks.items()}
+            loaded = {key: future.result() for key, future in futures.items()}
+        else:
+            loaded = {key: self.load_many(*task) for key, task in tasks.items()}
+
+        for field, info in spec.items():
+            documents = {_id: dict(doc) for _id, doc in loaded[_group_key(info)].items()}
+            if info.get("fields"):
+                self.resolve(list(documents.values()), info["fields"])
+
+            target = info.get("as", field)
+            for obj in objects:
+                value = _get_value(obj, field)
+                if info.get("is_list", False):
+                    _set_value(obj, target, [documents.get(_id) for _id in value or []])
+                else:
+                    _set_value(obj, target, documents.get(value) if value is not None else None)
+
+        return objects
+
+
+def get_request_loader() -> ReferenceLoader:
+    """
+    Returns the loader memoizing references for the current request (a new one outside requests).
+    """
+    if not has_app_context():
+        return ReferenceLoader()
+    if "reference_loader" not in g:
+        g.reference_loader = ReferenceLoader()
+    return g.reference_loader
+
+
+def load_references(objects: list, spec: dict) -> list:
+    return get_request_loader().resolve(objects, spec)
@@ -0,0 +1,48 @@
+from flask import current_app as app, has_app_context
+from pymongo.read_preferences import SecondaryPreferred
+
+from esg_lib.monitoring import command_monitor, pool_monitor
+
+# Smallest maxStalenessSeconds accepted by MongoDB
+DEFAULT_MAX_STALENESS = 90
+
+# App config key -> MongoClient option
+CLIENT_OPTION_KEYS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+
+
+def get_client_options(config) -> dict:
+    """
+    Builds the MongoClient pool options from the app config, to be passed to Flask-PyMongo:
+
+        mongo = PyMongo(app, **get_client_options(app.config))
+
+    Set ``MONGO_MONITORING`` to register the listeners from ``esg_lib.monitoring``,
+    whose figures are returned by ``get_mongo_stats()``.
+    """
+    options = {
+        option: config[key] for key, option in CLIENT_OPTION_KEYS.items() if config.get(key) is not None
+    }
+    if config.get("MONGO_MONITORING"):
+        options["event_listeners"] = [command_monitor, pool_monitor]
+    return options
+
+
+def get_secondary_read_preference():
+    """
+    Read preference for queries that tolerate replication lag (audit search, reference
+    lookups, reports): a secondary at most ``MONGO_MAX_STALENESS_SECONDS`` behind, or the
+    primary when none qualifies.
+
+    Returns None (client default, i.e. the primary) unless ``MONGO_SECONDARY_READS`` is set.
+    """
+    if not has_app_context() or not app.config.get("MONGO_SECONDARY_READS"):
+        return None
+    return SecondaryPreferred(max_staleness=app.config.get("MONGO_MAX_STALENESS_SECONDS", DEFAULT_MAX_STALENESS))
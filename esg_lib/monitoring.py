@@ -0,0 +1,147 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+
+def _new_stats() -> dict:
+    return {"count": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+def _record(stats: dict, duration_ms: float, failed: bool = False):
+    stats["count"] += 1
+    stats["total_ms"] += duration_ms
+    stats["max_ms"] = max(stats["max_ms"], duration_ms)
+    if failed:
+        stats["failed"] += 1
+
+
+def _snapshot(stats: dict) -> dict:
+    return {**stats, "avg_ms": stats["total_ms"] / stats["count"] if stats["count"] else 0.0}
+
+
+class CommandLatencyListener(monitoring.CommandListener):
+    """
+    Records command latency per ``collection.command`` (e.g. ``audit.aggregate``), or
+    ``database.command`` for commands that do not target a collection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        command = event.command
+        if event.command_name == "getMore":
+            return command.get("collection")
+        target = command.get(event.command_name)
+        return target if isinstance(target, str) else None
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = self._collection(event) or event.database_name
+
+    def _finished(self, event, failed: bool):
+        with self._lock:
+            target = self._pending.pop((event.connection_id, event.request_id), None)
+            key = f"{target}.{event.command_name}"
+            _record(self._stats.setdefault(key, _new_stats()), event.duration_micros / 1000, failed)
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {key: _snapshot(stats) for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class PoolWaitListener(monitoring.ConnectionPoolListener):
+    """
+    Records how long threads wait to check a connection out of the pool, and pool usage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wait = _new_stats()
+        self._counters = {
+            "in_use": 0,
+            "created": 0,
+            "closed": 0,
+            "cleared": 0,
+        }
+
+    def _wait_ms(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return (time.monotonic() - started) * 1000 if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.monotonic()
+
+    def connection_checked_out(self, event):
+        wait_ms = self._wait_ms()
+        with self._lock:
+            _record(self._wait, wait_ms)
+            self._counters["in_use"] += 1
+
+    def connection_check_out_failed(self, event):
+        wait_ms = self._wait_ms()
+        with self._lock:
+            _record(self._wait, wait_ms, failed=True)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._counters["in_use"] -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self._counters["created"] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._counters["closed"] += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._counters["cleared"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"checkout_wait": _snapshot(self._wait), **self._counters}
+
+    def reset(self):
+        with self._lock:
+            self._wait = _new_stats()
+
+
+command_monitor = CommandLatencyListener()
+pool_monitor = PoolWaitListener()
+
+
+def get_mongo_stats() -> dict:
+    """
+    Returns the pool wait and per-collection latency recorded since the last reset.
+    """
+    return {"pool": pool_monitor.stats(), "commands": command_monitor.stats()}
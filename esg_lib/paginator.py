@@ -1,14 +1,69 @@
+import base64
+
+from bson import json_util
+
+
 class Paginator:
     content = None
     page = None
     size = None
     total = None
+    next_cursor = None
+    total_capped = None
 
-    def __init__(self, content, page, size, total):
+    def __init__(self, content, page, size, total, next_cursor=None, total_capped=None):
         self.content = content
         self.page = page
         self.size = size
         self.total = total
+        if next_cursor is not None:
+            self.next_cursor = next_cursor
+        if total_capped is not None:
+            self.total_capped = total_capped
 
     def to_dict(self):
         return self.__dict__
+
+
+def encode_cursor(sort_key: str, sort_order: int, last_value, last_id) -> str:
+    """
+    Builds an opaque continuation token from the last row of a page.
+    """
+    payload = json_util.dumps({"k": sort_key, "o": sort_order, "v": last_value, "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_key: str, sort_order: int):
+    """
+    Returns the ``(last_value, last_id)`` pair stored in a token built by ``encode_cursor``.
+    """
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if payload.get("k") != sort_key or payload.get("o") != sort_order:
+        raise ValueError("Cursor does not match the requested sort")
+    return payload.get("v"), payload.get("id")
+
+
+def keyset_condition(sort_key: str, sort_order: int, last_value, last_id) -> dict:
+    """
+    Builds the condition selecting rows after ``(last_value, last_id)`` when sorting
+    on ``{sort_key: sort_order, "_id": sort_order}``. Null and missing values sort first.
+    """
+    op = "$gt" if sort_order == 1 else "$lt"
+
+    if sort_key == "_id":
+        return {"_id": {op: last_id}}
+
+    if last_value is None:
+        branches = [{sort_key: None, "_id": {op: last_id}}]
+        if sort_order == 1:
+            branches.append({sort_key: {"$ne": None}})
+    else:
+        branches = [{sort_key: {op: last_value}}, {sort_key: last_value, "_id": {op: last_id}}]
+        if sort_order != 1:
+            branches.append({sort_key: None})
+
+    return {"$or": branches}
@@ -0,0 +1,120 @@
+import threading
+
+from esg_lib.cache import TTLCache
+from esg_lib.document import Document
+
+REFERENCE_COLLECTIONS = ["axes", "engagements", "objectives", "entities", "groups"]
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class ReferenceCache:
+    """
+    Id -> document maps for small, rarely changing reference collections.
+
+    Disabled until ``configure`` is called. Each collection keeps at most ``max_entries``
+    documents for ``ttl`` seconds. Writes made through ``Document`` invalidate the
+    affected entries, and a per-collection version keeps a read that raced with a
+    write from caching stale documents.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.collections = set()
+        self.ttl = DEFAULT_TTL
+        self.max_entries = DEFAULT_MAX_ENTRIES
+
+        self._lock = threading.Lock()
+        self._caches = {}
+        self._versions = {}
+
+    def configure(self, collections=None, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        with self._lock:
+            self.enabled = True
+            self.collections = set(REFERENCE_COLLECTIONS if collections is None else collections)
+            self.ttl = ttl
+            self.max_entries = max_entries
+            self._caches = {}
+
+    def disable(self):
+        with self._lock:
+            self.enabled = False
+            self._caches = {}
+
+    def is_cached(self, collection_name: str) -> bool:
+        return self.enabled and collection_name in self.collections
+
+    def _get_cache(self, collection_name: str) -> TTLCache:
+        with self._lock:
+            cache = self._caches.get(collection_name)
+            if cache is None:
+                cache = self._caches[collection_name] = TTLCache(max_entries=self.max_entries, ttl=self.ttl)
+            return cache
+
+    def version(self, collection_name: str) -> int:
+        return self._versions.get(collection_name, 0)
+
+    def get_many(self, collection_name: str, ids, collection=None, projection=None) -> dict:
+        """
+        Returns ``{id: document}`` for the given ids, querying only the ids not cached,
+        with a single ``$in``. Ids that do not exist are left out.
+
+        ``projection`` is only applied when the collection is not cached, since cached
+        entries hold whole documents.
+        """
+        ids = list(dict.fromkeys(i for i in ids if i is not None))
+        if collection is None:
+            from esg_lib.mongo import get_secondary_read_preference
+
+            collection = Document.get_collection(collection_name, get_secondary_read_preference())
+
+        if not self.is_cached(collection_name):
+            if not ids:
+                return {}
+            return {doc["_id"]: doc for doc in collection.find({"_id": {"$in": ids}}, projection)}
+
+        cache = self._get_cache(collection_name)
+        found = {}
+        missing = []
+        for _id in ids:
+            doc = cache.get(_id)
+            if doc is None:
+                missing.append(_id)
+            else:
+                found[_id] = dict(doc)
+
+        if missing:
+            version = self.version(collection_name)
+            documents = list(collection.find({"_id": {"$in": missing}}))
+            store = self.version(collection_name) == version
+            for doc in documents:
+                if store:
+                    cache.set(doc["_id"], doc)
+                found[doc["_id"]] = dict(doc)
+
+        return found
+
+    def invalidate(self, collection_name: str, ids=None):
+        """
+        Drops the given ids from a collection cache, or the whole collection when ``ids`` is None.
+        """
+        with self._lock:
+            self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+            cache = self._caches.get(collection_name)
+
+        if cache is None:
+            return
+        if ids is None:
+            cache.clear()
+        else:
+            for _id in ids:
+                cache.delete(_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            caches = dict(self._caches)
+        return {name: cache.stats() for name, cache in caches.items()}
+
+
+reference_cache = ReferenceCache()
+Document.add_write_listener(reference_cache.invalidate)
@@ -1,6 +1,6 @@
 import json
 
-from flask_restx import reqparse
+from flask_restx import inputs, reqparse
 
 def get_email_request_parse():
     parser = reqparse.RequestParser()
@@ -33,4 +33,36 @@ def get_default_paginated_request_parse(parser: reqparse.RequestParser = None) -
     parser.add_argument("page", type=int, location="args", default=1)
     parser.add_argument("size", type=int, location="args", default=10)
     parser.add_argument("filters", type=json.loads, location="args")
+    # Opaque continuation token for keyset pagination, empty for the first page
+    parser.add_argument("cursor", location="args")
+    return parser
+
+
+def get_export_request_parse() -> reqparse.RequestParser:
+    """
+    Create a request parser for streamed exports.
+
+    Returns:
+        reqparse.RequestParser: A request parser with sort, format and gzip arguments
+    """
+    parser = reqparse.RequestParser()
+    parser.add_argument("sort_key", location="args", default="_id")
+    parser.add_argument("sort_order", type=int, location="args", default=-1)
+    parser.add_argument("format", location="args", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("gzip", type=inputs.boolean, location="args", default=False)
+    return parser
+
+
+def get_rollup_request_parse() -> reqparse.RequestParser:
+    """
+    Create a request parser for audit activity summaries.
+
+    Returns:
+        reqparse.RequestParser: A request parser with period, grouping and granularity arguments
+    """
+    parser = reqparse.RequestParser()
+    parser.add_argument("start", type=inputs.datetime_from_iso8601, location="args")
+    parser.add_argument("end", type=inputs.datetime_from_iso8601, location="args")
+    parser.add_argument("group_by", location="args", action="split")
+    parser.add_argument("granularity", location="args", choices=("day", "week", "month", "year"), default="day")
     return parser
@@ -116,6 +116,196 @@ def create_reference_lookups(nested_fields: dict) -> list:
     return pipeline
 
 
+def _path_references_fields(path: str, fields) -> bool:
+    # Aggregation paths: "$field.sub", "$$ROOT.field.sub" or "$$CURRENT.field.sub"
+    for root in ("$$ROOT", "$$CURRENT"):
+        if path == root:
+            return True
+        if path.startswith(root + "."):
+            path = "$" + path[len(root) + 1:]
+    if path.startswith("$$"):
+        return False
+    return path[1:].split(".")[0] in fields
+
+
+def _references_fields(condition, fields, expression: bool = False) -> bool:
+    """
+    Tells if a match/sort document reads any of ``fields`` (or their sub-fields),
+    including the ``$field`` paths of ``$expr`` expressions.
+    """
+    if isinstance(condition, list):
+        return any(_references_fields(c, fields, expression) for c in condition)
+    if isinstance(condition, str):
+        return expression and condition.startswith("$") and _path_references_fields(condition, fields)
+    if not isinstance(condition, dict):
+        return False
+    for key, value in condition.items():
+        if key.startswith("$"):
+            if _references_fields(value, fields, expression or key == "$expr"):
+                return True
+        elif expression:
+            # Expression operands, e.g. {"$let": {"vars": {"name": "$axe.name"}}}
+            if _references_fields(value, fields, expression):
+                return True
+        elif key.split(".")[0] in fields:
+            return True
+    return False
+
+
+def _is_inclusive(projection: dict) -> bool:
+    return any(value not in (0, False) for key, value in projection.items() if key != "_id")
+
+
+def _is_projected(field: str, projection: dict) -> bool:
+    if not projection:
+        return True
+    if _is_inclusive(projection):
+        return any(
+            value not in (0, False)
+            for key, value in projection.items()
+            if key == field or key.startswith(field + ".")
+        )
+    return projection.get(field, 1) not in (0, False)
+
+
+def _split_projection(projection: dict, lookup_fields) -> tuple:
+    """
+    Splits a projection applied before the lookups into the base document projection,
+    keeping the ids of the joined fields, and the ``$project`` of each joined collection.
+    """
+    inclusive = _is_inclusive(projection)
+    base = {}
+    joined = {}
+    for key, value in projection.items():
+        field, _, sub_field = key.partition(".")
+        if field not in lookup_fields or not sub_field:
+            base[key] = value
+            continue
+        joined.setdefault(field, {})[sub_field] = value
+        if inclusive:
+            base[field] = 1
+
+    if inclusive:
+        # As with a projection of the joined documents, their _id is only kept when requested
+        for sub_projection in joined.values():
+            sub_projection.setdefault("_id", 0)
+    return base, joined
+
+
+def build_reference_pipeline(
+    nested_fields: dict,
+    match: dict = None,
+    sort: dict = None,
+    page: int = None,
+    size: int = None,
+    projection: dict = None,
+) -> list:
+    """
+    Builds a paginated aggregation pipeline joining the referenced documents, like
+    ``create_reference_lookups`` but ordered and trimmed so the lookups run on as few
+    documents, and pull as little data, as possible.
+
+    Args:
+        nested_fields (dict): Same as ``create_reference_lookups``, each entry also
+            accepting "fields" (list): the only fields of the joined documents to keep.
+        match (dict, optional): ``$match`` condition. Its conditions that do not read a
+            joined field are applied before the lookups, the others after.
+        sort (dict, optional): ``$sort`` specification.
+        page (int, optional): 1-based page number, used with ``size``.
+        size (int, optional): Page size.
+        projection (dict, optional): ``$project`` of the result, applied before the
+            lookups when the page can be cut first. Keys under a joined field, e.g.
+            ``{"axe.name": 1}``, become the ``$project`` of that lookup. Joined fields
+            left out of the projection are not looked up unless the match or sort reads them.
+
+    Returns:
+        list: The pipeline stages. ``$sort``/``$skip``/``$limit`` are placed before the
+            lookups unless the sort or match reads a joined field.
+
+    Notes:
+        - Lookups with "fields" use the ``localField``/``foreignField`` plus ``pipeline``
+          form, which requires MongoDB 5.0 or later.
+    """
+    match = match or {}
+    sort = sort or {}
+
+    lookup_fields = set(nested_fields)
+    pre_match = {k: v for k, v in match.items() if not _references_fields({k: v}, lookup_fields)}
+    post_match = {k: v for k, v in match.items() if k not in pre_match}
+    page_first = not post_match and not _references_fields(sort, lookup_fields)
+
+    # Only join the fields that are returned, or needed to filter and sort
+    nested_fields = {
+        field: info
+        for field, info in nested_fields.items()
+        if _is_projected(field, projection)
+        or _references_fields(post_match, {field})
+        or _references_fields(sort, {field})
+    }
+
+    page_stages = []
+    if sort:
+        page_stages.append({"$sort": sort})
+    if page and size:
+        page_stages.append({"$skip": max((page - 1) * size, 0)})
+    if size:
+        page_stages.append({"$limit": size})
+
+    joined_projections = {}
+    pipeline = []
+    if pre_match:
+        pipeline.append({"$match": pre_match})
+    if page_first:
+        pipeline.extend(page_stages)
+        if projection:
+            base_projection, joined_projections = _split_projection(projection, lookup_fields)
+            if base_projection:
+                pipeline.append({"$project": base_projection})
+
+    for field_name, field_info in nested_fields.items():
+        lookup = {
+            "from": field_info["collection"],
+            "localField": field_name,
+            "foreignField": "_id",
+            "as": field_name,
+        }
+        if field_name in joined_projections:
+            lookup["pipeline"] = [{"$project": joined_projections[field_name]}]
+        elif field_info.get("fields"):
+            lookup["pipeline"] = [{"$project": {field: 1 for field in field_info["fields"]}}]
+        pipeline.append({"$lookup": lookup})
+
+        if not field_info.get("is_list", False):
+            pipeline.append(
+                {
+                    "$unwind": {
+                        "path": f"${field_name}",
+                        "preserveNullAndEmptyArrays": True,
+                    }
+                }
+            )
+
+    if not page_first:
+        if post_match:
+            pipeline.append({"$match": post_match})
+        pipeline.extend(page_stages)
+        if projection:
+            pipeline.append({"$project": projection})
+
+    return pipeline
+
+
+def explain_pipeline(collection, pipeline: list, verbosity: str = "queryPlanner") -> dict:
+    """
+    Returns the ``explain`` output of an aggregation pipeline on ``collection``.
+    """
+    return collection.database.command(
+        "explain",
+        {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}},
+        verbosity=verbosity,
+    )
+
+
 def fetch_objectives_with_details(
     objective_ids: str,
     objective_table="objectives",
@@ -167,24 +357,19 @@ def fetch_objectives_with_details(
             }
         }
     """
-    from esg_lib.document import Document
-
-    objectives_collection = Document.get_collection(objective_table)
-    engagements_collection = Document.get_collection(engagement_table)
-    axes_collection = Document.get_collection(axe_table)
+    from esg_lib.loader import get_request_loader
 
-    objectives = list(objectives_collection.find({"_id": {"$in": objective_ids}}))
+    loader = get_request_loader()
+    objectives = [dict(obj) for obj in loader.load_many(objective_table, objective_ids).values()]
 
-    engagement_ids = {obj["engagement"] for obj in objectives if "engagement" in obj}
-    axe_ids = {obj["axe"] for obj in objectives if "axe" in obj}
-
-    engagements = list(
-        engagements_collection.find({"_id": {"$in": list(engagement_ids)}})
+    # Engagements and axes are independent, the loader fetches them concurrently
+    loader.resolve(
+        objectives,
+        {
+            "engagement": {"collection": engagement_table, "projection": ["name"], "as": "engagement_details"},
+            "axe": {"collection": axe_table, "projection": ["name"], "as": "axe_details"},
+        },
     )
-    axes = list(axes_collection.find({"_id": {"$in": list(axe_ids)}}))
-
-    engagement_lookup = {eng["_id"]: eng for eng in engagements}
-    axe_lookup = {ax["_id"]: ax for ax in axes}
 
     return {
         obj["_id"]: {
@@ -193,7 +378,7 @@ def fetch_objectives_with_details(
             "engagement": (
                 {
                     "id": obj["engagement"],
-                    "name": engagement_lookup.get(obj["engagement"], {}).get("name"),
+                    "name": (obj["engagement_details"] or {}).get("name"),
                 }
                 if "engagement" in obj
                 else None
@@ -201,7 +386,7 @@ def fetch_objectives_with_details(
             "axe": (
                 {
                     "id": obj["axe"],
-                    "name": axe_lookup.get(obj["axe"], {}).get("name"),
+                    "name": (obj["axe_details"] or {}).get("name"),
                 }
                 if "axe" in obj
                 else None
@@ -224,16 +409,7 @@ def inject_objectives(objects: list) -> list:
 
 
 def load_entities(data, collection):
-    entity_ids = set()
-    for doc in data:
-        entity_ids.update(doc.entities or [])
-
-    entities = list(collection.find({"_id": {"$in": list(entity_ids)}}))
-
-    entity_dict = {entity["_id"]: entity for entity in entities}
+    from esg_lib.loader import get_request_loader
 
-    for doc in data:
-        doc.entities_list = [
-            entity_dict.get(entity_id) for entity_id in doc.entities or []
-        ]
-    return data
+    spec = {"entities": {"collection": collection.name, "source": collection, "is_list": True, "as": "entities_list"}}
+    return get_request_loader().resolve(data, spec)